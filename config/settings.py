@@ -71,9 +71,17 @@ CONFIDENCE = {
 # ── Apollo Enrichment Settings ────────────────────────────────────────────────
 APOLLO_SETTINGS = {
     "base_url":        "https://api.apollo.io/v1",
-    "rate_limit_rpm":  10,             # Free tier: ~10 req/min
+    "rate_limit_rpm":  100,            # Sustained cap: 100 req/min
+    "burst_limit":     10,             # Up to 10 req/sec in a burst
+    "max_workers":     10,             # Concurrent enrichment requests
+    "bulk_batch_size": 10,             # /people/bulk_match accepts up to 10 records
     "max_retries":     3,
-    "retry_delay_s":   6,
+    "backoff_base_s":  1.0,            # 429/error backoff: base * 2**attempt ...
+    "backoff_cap_s":   30,             # ... capped here ...
+    "backoff_jitter":  0.5,            # ... plus up to 50% random jitter
+    "retry_cap_s":     120,            # Longest Retry-After/X-RateLimit-Reset wait honoured
+    "cache_path":      "cache/apollo_cache.sqlite",
+    "cache_ttl_s":     4 * 3600,       # Person fields (email, LinkedIn) go stale first
     "fields_wanted": [
         "linkedin_url", "email", "organization.estimated_num_employees",
         "organization.funding_stage", "organization.industry",
@@ -0,0 +1,114 @@
+"""
+enrichment/apollo_async.py
+===========================
+asyncio + aiohttp variant of the Apollo enrichment fan-out.
+
+A single event loop keeps up to `max_workers` bulk_match calls in flight on
+one pooled aiohttp session, instead of parking a thread per request. Rate
+limiting and retries mirror ApolloClient._post; cache lookup, payload
+building, response parsing and email-export grouping are ApolloClient's own
+helpers — the client instance is passed in, and only the I/O lives here.
+
+HOW TO RUN:
+    python enrichment/apollo_enricher.py --async
+"""
+
+import asyncio
+import logging
+
+import aiohttp
+
+from config.settings import APOLLO_SETTINGS
+from utils.rate_limit import AsyncTokenBucket
+
+log = logging.getLogger(__name__)
+
+
+# ── Apollo calls ──────────────────────────────────────────────────────────────
+
+async def _post(session, client, bucket, path: str, payload: dict, label: str) -> dict | None:
+    """
+    Async counterpart of ApolloClient._post.
+
+    Returns:
+        parsed JSON on 200, empty dict on 422 (no match), None on failure
+    """
+    for attempt in range(1, APOLLO_SETTINGS["max_retries"] + 1):
+        try:
+            await bucket.acquire()
+            async with session.post(f"{client.base_url}{path}", json=payload) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+
+                elif resp.status == 422:
+                    log.warning(f"[{label}] No match found in Apollo (422)")
+                    return {}
+
+                elif resp.status == 429:
+                    wait = max(client._server_wait(resp), client._backoff(attempt))
+                    log.warning(f"[{label}] Rate limited (429) — waiting {wait:.1f}s")
+                    await asyncio.sleep(wait)
+
+                else:
+                    text = await resp.text()
+                    log.error(f"[{label}] Apollo error {resp.status}: {text[:200]}")
+                    return None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.error(f"[{label}] Request failed (attempt {attempt}): {e}")
+            if attempt < APOLLO_SETTINGS["max_retries"]:
+                await asyncio.sleep(client._backoff(attempt))
+
+    return None
+
+
+async def bulk_match(session, client, bucket, rows: list[dict],
+                     export_email: bool = False) -> list[dict]:
+    """Async /people/bulk_match — cache and parsing are shared with ApolloClient."""
+    results, pending, payload = client._bulk_request(rows, export_email)
+    if not pending:
+        return results
+
+    data = await _post(session, client, bucket, "/people/bulk_match", payload, f"bulk x{len(pending)}")
+    return client._bulk_merge(results, pending, data, export_email)
+
+
+# ── Fan-out ───────────────────────────────────────────────────────────────────
+
+async def enrich_many(client, batches: list[list[tuple[int, dict]]]) -> list[list[dict]]:
+    """
+    Enrich batches of (row_index, row) pairs concurrently.
+
+    Returns:
+        one list of enriched-field dicts per batch, aligned with its rows
+    """
+    total     = sum(len(batch) for batch in batches)
+    limit     = APOLLO_SETTINGS["max_workers"]
+    semaphore = asyncio.Semaphore(limit)
+    bucket    = AsyncTokenBucket(
+        rate=APOLLO_SETTINGS["rate_limit_rpm"] / 60,
+        burst=APOLLO_SETTINGS["burst_limit"],
+    )
+
+    connector = aiohttp.TCPConnector(limit=limit, ttl_dns_cache=300)
+    timeout   = aiohttp.ClientTimeout(total=10)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers=client.headers,
+    ) as session:
+
+        async def match(batch):
+            matched = {}
+            async with semaphore:
+                for export_email, group, rows in client.export_groups(batch, total):
+                    results = await bulk_match(session, client, bucket, rows, export_email=export_email)
+                    matched.update((i, result) for (i, _), result in zip(group, results))
+            return [matched[i] for i, _ in batch]
+
+        # gather() preserves input order, so the caller can checkpoint contiguously
+        return await asyncio.gather(*(match(batch) for batch in batches))
+
+
+def run_enrich_many(client, batches: list[list[tuple[int, dict]]]) -> list[list[dict]]:
+    """Synchronous entry point for _run_enrichment."""
+    return asyncio.run(enrich_many(client, batches))
@@ -26,16 +26,26 @@ OUTPUTS:
 
 import os
 import sys
+import csv
 import time
 import json
+import random
+import sqlite3
+import hashlib
 import logging
+import threading
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from contextlib import ExitStack
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.settings import APOLLO_API_KEY, APOLLO_SETTINGS, DATA_RAW, DATA_ENRICHED
 from enrichment.icp_scorer import score_row
+from utils.rate_limit import TokenBucket
 
 logging.basicConfig(
     level=logging.INFO,
@@ -48,6 +58,53 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
+# ── Response cache ────────────────────────────────────────────────────────────
+
+class ResponseCache:
+    """
+    On-disk SQLite cache of parsed people_match results.
+    Re-runs (e.g. after tweaking ICP scoring) are served from disk and never
+    touch the rate limiter or spend API credits. Entries expire after `ttl_s`.
+    """
+
+    def __init__(self, path: str, ttl_s: int):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS apollo (key TEXT PRIMARY KEY, payload BLOB, ts INT)"
+        )
+
+    @staticmethod
+    def make_key(name: str, company: str, export_email: bool) -> str:
+        """Hash of the normalized (name, company, export_email) identity."""
+        norm = "|".join([
+            " ".join(str(name).lower().split()),
+            " ".join(str(company).lower().split()),
+            str(bool(export_email)),
+        ])
+        return hashlib.blake2b(norm.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Return the cached result (possibly an empty no-match dict), or None on miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, ts FROM apollo WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_s:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, result: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO apollo (key, payload, ts) VALUES (?, ?, ?)",
+                (key, json.dumps(result), int(time.time())),
+            )
+            self._conn.commit()
+
+
 # ── Apollo API client ─────────────────────────────────────────────────────────
 
 class ApolloClient:
@@ -59,71 +116,214 @@ class ApolloClient:
             )
         self.api_key  = api_key
         self.base_url = APOLLO_SETTINGS["base_url"]
-        self.headers  = {"Content-Type": "application/json", "Cache-Control": "no-cache"}
-        self._request_count = 0
+        self.headers  = {
+            "Content-Type":  "application/json",
+            "Cache-Control": "no-cache",
+            "Connection":    "keep-alive",
+        }
+
+        # One pooled session shared by all workers — keeps TCP/TLS connections warm
+        pool_size    = APOLLO_SETTINGS["max_workers"]
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0,
+        ))
+        self.session.headers.update(self.headers)
+
+        self._bucket = TokenBucket(
+            rate=APOLLO_SETTINGS["rate_limit_rpm"] / 60,
+            burst=APOLLO_SETTINGS["burst_limit"],
+        )
+        self.cache = ResponseCache(APOLLO_SETTINGS["cache_path"], APOLLO_SETTINGS["cache_ttl_s"])
 
     def _rate_limit(self):
-        """Respect Apollo free tier: 10 req/min → sleep 6s between calls."""
-        self._request_count += 1
-        if self._request_count % APOLLO_SETTINGS["rate_limit_rpm"] == 0:
-            log.info(f"Rate limit pause after {self._request_count} requests...")
-            time.sleep(60)  # full minute cooldown every 10 requests
-        else:
-            time.sleep(APOLLO_SETTINGS["retry_delay_s"])
+        """Respect Apollo's per-minute cap — blocks until the shared bucket has a token."""
+        self._bucket.acquire()
 
-    def people_match(self, name: str, company: str, export_email: bool = False) -> dict:
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Capped exponential backoff with multiplicative jitter."""
+        delay = min(APOLLO_SETTINGS["backoff_cap_s"], APOLLO_SETTINGS["backoff_base_s"] * 2 ** attempt)
+        return delay * (1 + random.random() * APOLLO_SETTINGS["backoff_jitter"])
+
+    @staticmethod
+    def _server_wait(resp) -> float:
         """
-        Call Apollo's /people/match endpoint.
+        Seconds the server asked us to wait, from Retry-After or X-RateLimit-Reset.
+        X-RateLimit-Reset may be epoch milliseconds, epoch seconds or a relative
+        number of seconds. Capped at APOLLO_SETTINGS["retry_cap_s"].
+        """
+        wait = 0.0
+        try:
+            wait = float(resp.headers.get("Retry-After", 0))
+        except (TypeError, ValueError):
+            pass
 
-        Args:
-            name:         Full name of the contact
-            company:      Company name
-            export_email: Whether to consume an email export credit (costly on free tier)
+        reset = resp.headers.get("X-RateLimit-Reset")
+        if reset:
+            try:
+                reset = float(reset)
+                if reset > 1e12:                    # epoch milliseconds
+                    reset = reset / 1000 - time.time()
+                elif reset > 1e9:                   # epoch seconds
+                    reset = reset - time.time()
+                wait = max(wait, reset)
+            except ValueError:
+                pass
+
+        return min(max(0.0, wait), APOLLO_SETTINGS["retry_cap_s"])
+
+    def _post(self, path: str, payload: dict, label: str) -> dict | None:
+        """
+        POST to an Apollo endpoint with rate limiting and retries.
 
         Returns:
-            dict with enriched fields, or empty dict on failure
+            parsed JSON on 200, empty dict on 422 (no match), None on failure
         """
-        payload = {
-            "api_key":      self.api_key,
-            "name":         name,
-            "organization_name": company,
-            "reveal_personal_emails": export_email,
-        }
-
         for attempt in range(1, APOLLO_SETTINGS["max_retries"] + 1):
             try:
                 self._rate_limit()
-                resp = requests.post(
-                    f"{self.base_url}/people/match",
+                resp = self.session.post(
+                    f"{self.base_url}{path}",
                     json=payload,
-                    headers=self.headers,
                     timeout=10,
                 )
 
                 if resp.status_code == 200:
-                    data = resp.json()
-                    person = data.get("person", {})
-                    return self._parse_person(person, export_email)
+                    return resp.json()
 
                 elif resp.status_code == 422:
-                    log.warning(f"[{name}] No match found in Apollo (422)")
+                    log.warning(f"[{label}] No match found in Apollo (422)")
                     return {}
 
                 elif resp.status_code == 429:
-                    wait = 60 * attempt
-                    log.warning(f"[{name}] Rate limited (429) — waiting {wait}s")
+                    wait = max(self._server_wait(resp), self._backoff(attempt))
+                    log.warning(f"[{label}] Rate limited (429) — waiting {wait:.1f}s")
                     time.sleep(wait)
 
                 else:
-                    log.error(f"[{name}] Apollo error {resp.status_code}: {resp.text[:200]}")
-                    return {}
+                    log.error(f"[{label}] Apollo error {resp.status_code}: {resp.text[:200]}")
+                    return None
 
             except requests.exceptions.RequestException as e:
-                log.error(f"[{name}] Request failed (attempt {attempt}): {e}")
+                log.error(f"[{label}] Request failed (attempt {attempt}): {e}")
                 if attempt < APOLLO_SETTINGS["max_retries"]:
-                    time.sleep(10 * attempt)
+                    time.sleep(self._backoff(attempt))
+
+        return None
+
+    def people_match(self, name: str, company: str, export_email: bool = False) -> dict:
+        """
+        Call Apollo's /people/match endpoint.
+
+        Args:
+            name:         Full name of the contact
+            company:      Company name
+            export_email: Whether to consume an email export credit (costly on free tier)
+
+        Returns:
+            dict with enriched fields, or empty dict on failure
+        """
+        # Cached hits skip the rate limiter entirely — only real calls spend tokens
+        cache_key = self.cache.make_key(name, company, export_email)
+        cached    = self.cache.get(cache_key)
+        if cached is not None:
+            log.info(f"[{name}] Served from cache")
+            return cached
+
+        payload = {
+            "api_key":      self.api_key,
+            "name":         name,
+            "organization_name": company,
+            "reveal_personal_emails": export_email,
+        }
+
+        data = self._post("/people/match", payload, name)
+        if data is None:
+            return {}
+
+        result = self._parse_person(data.get("person", {}), export_email)
+        self.cache.set(cache_key, result)
+        return result
+
+    def bulk_match(self, rows: list[dict], export_email: bool = False) -> list[dict]:
+        """
+        Call Apollo's /people/bulk_match endpoint for up to 10 contacts at once.
+
+        Args:
+            rows:         dicts with 'name' and 'company'
+            export_email: Applies to the whole call — split batches by this flag
+
+        Returns:
+            list of enriched-field dicts aligned with `rows` ({} where no match)
+        """
+        results, pending, payload = self._bulk_request(rows, export_email)
+        if not pending:
+            return results
+
+        data = self._post("/people/bulk_match", payload, f"bulk x{len(pending)}")
+        return self._bulk_merge(results, pending, data, export_email)
+
+    # ── bulk_match building blocks (shared with apollo_async) ─────────────────
+
+    def _bulk_request(self, rows: list[dict], export_email: bool) -> tuple[list[dict], list, dict]:
+        """
+        Serve what we can from cache and build the payload for the rest.
 
-        return {}
+        Returns:
+            (results aligned with `rows`, pending (position, cache_key, row), payload)
+        """
+        results = [{} for _ in rows]
+        pending = []   # (position, cache_key, row) still needing an API call
+
+        for pos, row in enumerate(rows):
+            cache_key = self.cache.make_key(row["name"], row["company"], export_email)
+            cached    = self.cache.get(cache_key)
+            if cached is not None:
+                results[pos] = cached
+            else:
+                pending.append((pos, cache_key, row))
+
+        payload = {
+            "api_key": self.api_key,
+            "reveal_personal_emails": export_email,
+            "details": [
+                {"name": row["name"], "organization_name": row["company"]}
+                for _, _, row in pending
+            ],
+        }
+        return results, pending, payload
+
+    def _bulk_merge(self, results: list[dict], pending: list, data: dict | None,
+                    export_email: bool) -> list[dict]:
+        """Parse a bulk_match response into `results` and cache each pending row."""
+        if data is None:
+            return results
+
+        matches = data.get("matches") or []
+        for n, (pos, cache_key, _) in enumerate(pending):
+            person = matches[n] if n < len(matches) else None
+            results[pos] = self._parse_person(person, export_email)
+            self.cache.set(cache_key, results[pos])
+
+        return results
+
+    @staticmethod
+    def export_groups(batch: list[tuple[int, dict]], total: int):
+        """
+        Split a batch of (row_index, row) pairs by export_email — one bulk_match
+        call per group, since the flag applies to the whole call.
+
+        Yields:
+            (export_email, group of (row_index, row), bulk_match rows)
+        """
+        for export_email in (False, True):
+            group = [(i, row) for i, row in batch if bool(row.get("export_email", False)) == export_email]
+            if not group:
+                continue
+            log.info(f"[{group[0][0]+1}–{group[-1][0]+1}/{total}] Enriching {len(group)} contacts "
+                     f"(email export: {export_email})")
+            yield export_email, group, [{"name": row["name"], "company": row["company"]} for _, row in group]
 
     def _parse_person(self, person: dict, include_email: bool) -> dict:
         """Extract only the fields we care about from Apollo's person object."""
@@ -169,11 +369,19 @@ class ApolloClient:
 
 # ── Enrichment orchestrator ───────────────────────────────────────────────────
 
+# Columns an Apollo match can add to a contact row (see ApolloClient._parse_person)
+ENRICHED_FIELDS = (
+    "linkedin_url", "company_size", "funding_stage",
+    "apollo_seniority", "apollo_dept", "email", "enrichment_status",
+)
+
+
 def enrich_contacts(
     input_path:  str = DATA_RAW,
     output_path: str = DATA_ENRICHED,
     dry_run:     bool = False,
     limit:       int = None,
+    use_async:   bool = False,
 ) -> pd.DataFrame:
     """
     Main enrichment function.
@@ -183,12 +391,13 @@ def enrich_contacts(
         output_path: Where to write enriched CSV
         dry_run:     If True, skips API calls and returns mock enriched data
         limit:       Process only first N rows (useful for testing)
+        use_async:   Fan out API calls on an asyncio event loop instead of threads
 
     Returns:
         Enriched DataFrame
     """
     log.info(f"Loading contacts from: {input_path}")
-    df = pd.read_csv(input_path)
+    df = pd.read_csv(input_path, engine="pyarrow")
 
     if limit:
         df = df.head(limit)
@@ -217,11 +426,11 @@ def enrich_contacts(
         df = _mock_enrich(df)
     else:
         client = ApolloClient(APOLLO_API_KEY)
-        df = _run_enrichment(df, client)
+        df = _run_enrichment(df, client, use_async=use_async)
 
     # Re-score with any updated fields from Apollo
     log.info("Re-scoring ICP after enrichment...")
-    df = df.apply(lambda r: pd.Series(score_row(r.to_dict())), axis=1)
+    df = pd.DataFrame([score_row(r) for r in df.to_dict(orient="records")], index=df.index)
 
     # Save checkpoint
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -232,39 +441,70 @@ def enrich_contacts(
     return df
 
 
-def _run_enrichment(df: pd.DataFrame, client: ApolloClient) -> pd.DataFrame:
-    """Run Apollo enrichment row by row with progress logging."""
+def _run_enrichment(df: pd.DataFrame, client: ApolloClient, use_async: bool = False) -> pd.DataFrame:
+    """
+    Run Apollo enrichment in bulk_match batches across a bounded thread pool.
+    The work is network-bound, so workers overlap request latency while the
+    client's token bucket keeps the combined rate within Apollo's limits.
+    With use_async, the same batches run on aiohttp (see apollo_async.py).
+    """
     enriched_rows = []
     total = len(df)
 
-    for i, row in df.iterrows():
-        log.info(f"[{i+1}/{total}] Enriching: {row['name']} @ {row['company']}")
-
-        result = client.people_match(
-            name=row["name"],
-            company=row["company"],
-            export_email=row.get("export_email", False),
-        )
-
-        # Merge enrichment results into the row
-        updated = row.to_dict()
-        if result:
-            for field, value in result.items():
-                # Don't overwrite existing non-empty values from Step 1
-                if not updated.get(field):
-                    updated[field] = value
-            updated["enrichment_status"] = "enriched"
+    # Single append-only checkpoint — one row written and flushed per contact
+    # (O(N) I/O), so a crashed run still leaves every finished row on disk.
+    # Name must match the CI clean-up glob (*_checkpoint_*.csv)
+    checkpoint_path = DATA_ENRICHED.replace(".csv", "_checkpoint_partial.csv")
+    fieldnames      = list(dict.fromkeys([*df.columns, *ENRICHED_FIELDS]))
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+
+    # Plain dicts, converted once — no per-row Series construction or boxing
+    records = df.to_dict(orient="records")
+
+    # Batches of up to 10 contacts — one bulk_match call per email-export group
+    rows    = iter(enumerate(records))
+    batches = list(iter(lambda: list(islice(rows, APOLLO_SETTINGS["bulk_batch_size"])), []))
+
+    def match(batch):
+        matched = {}
+        for export_email, group, rows in client.export_groups(batch, total):
+            results = client.bulk_match(rows, export_email=export_email)
+            matched.update((i, result) for (i, _), result in zip(group, results))
+        return [matched[i] for i, _ in batch]
+
+    with ExitStack() as stack:
+        f = stack.enter_context(open(checkpoint_path, "w", newline="", encoding="utf-8"))
+        if use_async:
+            # Imported lazily — aiohttp is only needed for the --async path
+            from enrichment.apollo_async import run_enrich_many
+            batch_results = run_enrich_many(client, batches)
         else:
-            updated["enrichment_status"] = "not_found"
-            log.warning(f"  → No Apollo match for {row['name']} @ {row['company']}")
+            pool = stack.enter_context(ThreadPoolExecutor(max_workers=APOLLO_SETTINGS["max_workers"]))
+            batch_results = pool.map(match, batches)
+
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+
+        # Results arrive in input order, so the checkpoint stays contiguous
+        for batch, results in zip(batches, batch_results):
+            for (i, row), result in zip(batch, results):
+                # Merge enrichment results into the row (records are ours to mutate)
+                updated = row
+                if result:
+                    for field, value in result.items():
+                        # Don't overwrite existing non-empty values from Step 1
+                        if not updated.get(field):
+                            updated[field] = value
+                    updated["enrichment_status"] = "enriched"
+                else:
+                    updated["enrichment_status"] = "not_found"
+                    log.warning(f"  → No Apollo match for {row['name']} @ {row['company']}")
 
-        enriched_rows.append(updated)
+                enriched_rows.append(updated)
+                writer.writerow(updated)
+                f.flush()
 
-        # Auto-checkpoint every 25 rows
-        if (i + 1) % 25 == 0:
-            checkpoint_path = DATA_ENRICHED.replace(".csv", f"_checkpoint_{i+1}.csv")
-            pd.DataFrame(enriched_rows).to_csv(checkpoint_path, index=False)
-            log.info(f"  💾 Checkpoint saved: {checkpoint_path}")
+    log.info(f"  💾 Checkpoint saved: {checkpoint_path}")
 
     return pd.DataFrame(enriched_rows)
 
@@ -284,8 +524,8 @@ def _mock_enrich(df: pd.DataFrame) -> pd.DataFrame:
     funding_stages = ["seed", "series_a", "series_b", "series_c", "public", ""]
 
     rows = []
-    for _, row in df.iterrows():
-        r = row.to_dict()
+    for row in df.to_dict(orient="records"):
+        r = dict(row)
         found = random.random()
 
         if found > 0.30:  # 70% match rate
@@ -315,8 +555,8 @@ def _print_summary(df: pd.DataFrame):
     """Print enrichment quality summary to stdout."""
     total     = len(df)
     enriched  = (df.get("enrichment_status", pd.Series()) == "enriched").sum()
-    has_email = df["email"].notna().apply(lambda x: bool(str(x).strip() and x != "nan")).sum()
-    has_li    = df["linkedin_url"].notna().apply(lambda x: bool(str(x).strip() and x != "nan")).sum()
+    has_email = df["email"].fillna("").astype(str).str.strip().ne("").sum()
+    has_li    = df["linkedin_url"].fillna("").astype(str).str.strip().ne("").sum()
 
     print("\n" + "=" * 50)
     print("  ENRICHMENT SUMMARY")
@@ -346,6 +586,8 @@ if __name__ == "__main__":
                         help="Only process first N contacts")
     parser.add_argument("--input",   default=DATA_RAW,    help="Input CSV path")
     parser.add_argument("--output",  default=DATA_ENRICHED, help="Output CSV path")
+    parser.add_argument("--async",   dest="use_async", action="store_true",
+                        help="Use the aiohttp/asyncio client instead of a thread pool")
     args = parser.parse_args()
 
     enrich_contacts(
@@ -353,4 +595,5 @@ if __name__ == "__main__":
         output_path=args.output,
         dry_run=args.dry_run,
         limit=args.limit,
+        use_async=args.use_async,
     )
@@ -25,7 +25,7 @@ import re
 import sys
 import logging
 import pandas as pd
-from difflib import SequenceMatcher
+from rapidfuzz import fuzz, process
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.settings import DATA_ENRICHED, DEDUP_SETTINGS
@@ -48,6 +48,9 @@ CO_SUFFIXES = re.compile(
     flags=re.IGNORECASE,
 )
 
+# Punctuation to strip from names and companies
+PUNCT = re.compile(r"[^\w\s]")
+
 
 def normalize_name(name: str) -> str:
     """
@@ -55,7 +58,7 @@ def normalize_name(name: str) -> str:
     'Dr. Sreedhara Panicker Somanath' → 'sreedhara panicker somanath'
     """
     name = HONORIFICS.sub("", str(name).strip())
-    name = re.sub(r"[^\w\s]", "", name)
+    name = PUNCT.sub("", name)
     return name.lower().strip()
 
 
@@ -65,18 +68,35 @@ def normalize_company(company: str) -> str:
     'Razorpay India Pvt Ltd' → 'razorpay'
     """
     company = CO_SUFFIXES.sub("", str(company).strip())
-    company = re.sub(r"[^\w\s]", "", company)
+    company = PUNCT.sub("", company)
     return company.lower().strip().split()[0] if company.strip() else ""
 
 
 def similarity(a: str, b: str) -> float:
-    """Levenshtein-based similarity ratio, 0.0–1.0."""
-    return SequenceMatcher(None, a, b).ratio() * 100
+    """Levenshtein-based similarity ratio, 0–100."""
+    return fuzz.ratio(a, b)
+
 
+def normalize_name_series(names: pd.Series) -> pd.Series:
+    """Column-wise normalize_name — one regex sweep per step over the whole Series."""
+    return (
+        names.fillna("").astype(str).str.strip()
+        .str.replace(HONORIFICS, "", regex=True)
+        .str.replace(PUNCT, "", regex=True)
+        .str.lower().str.strip()
+    )
 
-def dedup_key(row) -> str:
-    """Composite key for exact dedup: normalized_name + "|" + normalized_company_first_word."""
-    return normalize_name(row["name"]) + "|" + normalize_company(row["company"])
+
+def normalize_company_series(companies: pd.Series) -> pd.Series:
+    """Column-wise normalize_company — returns the first word of the cleaned name."""
+    return (
+        companies.fillna("").astype(str).str.strip()
+        .str.replace(CO_SUFFIXES, "", regex=True)
+        .str.replace(PUNCT, "", regex=True)
+        .str.lower()
+        .str.split(n=1).str[0]
+        .fillna("")
+    )
 
 
 # ── Core dedup logic ──────────────────────────────────────────────────────────
@@ -93,75 +113,97 @@ def find_duplicates(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
     threshold = DEDUP_SETTINGS["fuzzy_threshold"]
     strategy  = DEDUP_SETTINGS["merge_strategy"]
 
-    df = df.copy().reset_index(drop=True)
-    df["_key"] = df.apply(dedup_key, axis=1)
+    df = _with_dedup_keys(df)
 
-    kept_indices   = []   # indices of records we'll keep
-    dup_records    = []   # records flagged as duplicates
-    processed_keys = {}   # key → kept_index
+    kept_indices   = set()  # indices of records we'll keep
+    dup_records    = []     # records flagged as duplicates
+    processed_keys = {}     # key → kept_index
+    by_company     = {}     # normalized company → ([kept_index], [normalized name])
 
-    for i, row in df.iterrows():
-        key     = row["_key"]
+    rows = df[["_key", "_nname", "_ncompany"]].itertuples(index=True, name=None)
+    for i, key, norm_name, norm_company in rows:
         matched = False
 
         # ── 1. Exact key match ────────────────────────────────────────────────
         if key in processed_keys:
             kept_idx = processed_keys[key]
-            log.info(f"[EXACT DUP] '{row['name']}' @ '{row['company']}' "
+            log.info(f"[EXACT DUP] '{df.at[i, 'name']}' @ '{df.at[i, 'company']}' "
                      f"matches row {kept_idx}")
             dup_records.append({
-                **row.to_dict(),
+                **df.loc[i].to_dict(),
                 "dup_reason": "exact_match",
-                "kept_id":    df.loc[kept_idx, "id"],
+                "kept_id":    df.at[kept_idx, "id"],
             })
             matched = True
 
         # ── 2. Fuzzy name match (same company first word) ─────────────────────
+        # Only rows in the same company block are compared (avoids false positives
+        # and keeps the comparison count proportional to block size, not N).
         if not matched:
-            norm_name    = normalize_name(row["name"])
-            norm_company = normalize_company(row["company"])
-
-            for existing_key, kept_idx in processed_keys.items():
-                ex_name, ex_co = existing_key.split("|", 1)
-
-                # Only compare if company root matches (avoids false positives)
-                if ex_co != norm_company:
-                    continue
-
-                name_sim = similarity(norm_name, ex_name)
-                if name_sim >= threshold:
-                    log.info(f"[FUZZY DUP] '{row['name']}' ≈ '{df.loc[kept_idx, 'name']}' "
-                             f"(similarity: {name_sim:.0f}%)")
-                    dup_records.append({
-                        **row.to_dict(),
-                        "dup_reason": f"fuzzy_match_{name_sim:.0f}pct",
-                        "kept_id":    df.loc[kept_idx, "id"],
-                    })
-                    matched = True
-                    break
+            # Parallel index/name lists per block — the name list is handed to
+            # rapidfuzz as-is, so no per-row candidate list is rebuilt in Python
+            block_idx, block_names = by_company.get(norm_company, ((), ()))
+            best = process.extractOne(
+                norm_name,
+                block_names,
+                scorer=fuzz.ratio,
+                score_cutoff=threshold,
+            ) if block_names else None
+
+            if best is not None:
+                _, name_sim, pos = best
+                kept_idx = block_idx[pos]
+                log.info(f"[FUZZY DUP] '{df.at[i, 'name']}' ≈ '{df.at[kept_idx, 'name']}' "
+                         f"(similarity: {name_sim:.0f}%)")
+                dup_records.append({
+                    **df.loc[i].to_dict(),
+                    "dup_reason": f"fuzzy_match_{name_sim:.0f}pct",
+                    "kept_id":    df.at[kept_idx, "id"],
+                })
+                matched = True
 
         # ── 3. Keep this record ───────────────────────────────────────────────
         if not matched:
             # If merge_strategy = keep_highest_icp, swap if new record scores higher
             if strategy == "keep_highest_icp" and key in processed_keys:
                 existing_idx = processed_keys[key]
-                if row.get("icp_score", 0) > df.loc[existing_idx, "icp_score"]:
+                if df.loc[i].get("icp_score", 0) > df.at[existing_idx, "icp_score"]:
                     # Demote the previously kept record
                     dup_records.append({
                         **df.loc[existing_idx].to_dict(),
                         "dup_reason": "replaced_by_higher_icp",
-                        "kept_id":    row["id"],
+                        "kept_id":    df.at[i, "id"],
                     })
-                    kept_indices.remove(existing_idx)
-                    kept_indices.append(i)
+                    kept_indices.discard(existing_idx)
+                    kept_indices.add(i)
                     processed_keys[key] = i
+                    block_idx = by_company[norm_company][0]
+                    block_idx[block_idx.index(existing_idx)] = i
             else:
-                kept_indices.append(i)
+                kept_indices.add(i)
                 processed_keys[key] = i
+                block_idx, block_names = by_company.setdefault(norm_company, ([], []))
+                block_idx.append(i)
+                block_names.append(norm_name)
+
+    return _split_results(df, kept_indices, dup_records)
 
-    clean_df = df.loc[kept_indices].drop(columns=["_key"]).reset_index(drop=True)
-    dups_df  = pd.DataFrame(dup_records).drop(columns=["_key"], errors="ignore")
 
+def _with_dedup_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with the normalized working columns used for dedup."""
+    df = df.copy().reset_index(drop=True)
+    # Composite key for exact dedup: normalized_name + "|" + normalized_company_first_word
+    df["_nname"]    = normalize_name_series(df["name"])
+    df["_ncompany"] = normalize_company_series(df["company"])
+    df["_key"]      = df["_nname"] + "|" + df["_ncompany"]
+    return df
+
+
+def _split_results(df: pd.DataFrame, kept_indices: set, dup_records: list) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Build (clean_df, duplicates_df) in input order, dropping working columns."""
+    work_cols = ["_key", "_nname", "_ncompany"]
+    clean_df = df.loc[sorted(kept_indices)].drop(columns=work_cols).reset_index(drop=True)
+    dups_df  = pd.DataFrame(dup_records).drop(columns=work_cols, errors="ignore")
     return clean_df, dups_df
 
 
@@ -179,10 +221,14 @@ def deduplicate(
     if output_path is None:
         output_path = input_path  # overwrite in place
 
-    dups_path = output_path.replace(".csv", "_duplicates_flagged.csv")
-
     log.info(f"Loading: {input_path}")
-    df = pd.read_csv(input_path)
+    df = pd.read_csv(input_path, engine="pyarrow")
+    return _dedup_and_save(df, output_path)
+
+
+def _dedup_and_save(df: pd.DataFrame, output_path: str) -> pd.DataFrame:
+    """Run find_duplicates on df, save clean + duplicates CSVs, print summary."""
+    dups_path = output_path.replace(".csv", "_duplicates_flagged.csv")
     original_count = len(df)
 
     log.info(f"Starting dedup on {original_count} contacts...")
@@ -234,8 +280,8 @@ def merge_and_dedup(list_a_path: str, list_b_path: str, output_path: str) -> pd.
     """
     log.info(f"Merging:\n  A: {list_a_path}\n  B: {list_b_path}")
 
-    df_a = pd.read_csv(list_a_path)
-    df_b = pd.read_csv(list_b_path)
+    df_a = pd.read_csv(list_a_path, engine="pyarrow")
+    df_b = pd.read_csv(list_b_path, engine="pyarrow")
 
     # Tag source before merging so we can trace origin
     df_a["merge_source"] = "list_a"
@@ -247,7 +293,7 @@ def merge_and_dedup(list_a_path: str, list_b_path: str, output_path: str) -> pd.
     merged = pd.concat([df_a, df_b], ignore_index=True)
     log.info(f"Merged {len(df_a)} + {len(df_b)} = {len(merged)} contacts. Deduplicating...")
 
-    return deduplicate(input_path=None, output_path=output_path)
+    return _dedup_and_save(merged, output_path)
 
 
 # ── Entry point ───────────────────────────────────────────────────────────────
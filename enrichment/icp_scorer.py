@@ -5,13 +5,16 @@ Computes ICP (Ideal Customer Profile) scores for each contact.
 
 Score = seniority_weight + industry_weight  (capped at 5)
 
-This module is intentionally stateless — it takes a row dict and
-returns a score. No I/O, no API calls, fully testable in isolation.
+This module is intentionally stateless — it takes a row dict (or a whole
+DataFrame, via score_frame) and returns a score. No I/O, no API calls,
+fully testable in isolation.
 """
 
 import re
 import sys
 import os
+import pandas as pd
+from functools import lru_cache
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import SENIORITY_WEIGHTS, INDUSTRY_WEIGHTS
@@ -38,7 +41,7 @@ SENIORITY_KEYWORD_MAP = {
 
 INDUSTRY_KEYWORD_MAP = {
     "Fintech": [
-        "zerodha", "razorpay", "groww", "phonePe", "open financial",
+        "zerodha", "razorpay", "groww", "phonepe", "open financial",
         "paytm", "cred", "lendgrid", "finstack", "insurancefirst",
         "wealthbridge", "payflow", "creditsense", "loantap", "finova",
         "razorx", "neobank", "simpl", "acko", "cashify", "ezetap",
@@ -92,18 +95,78 @@ INDUSTRY_KEYWORD_MAP = {
 }
 
 
+
+# Keyword maps normalised once at import — matching always runs on lowercased text
+_SENIORITY_KWS = {tier: tuple(kw.lower() for kw in kws) for tier, kws in SENIORITY_KEYWORD_MAP.items()}
+_INDUSTRY_KWS  = {ind: tuple(kw.lower() for kw in kws) for ind, kws in INDUSTRY_KEYWORD_MAP.items()}
+
+
+def _keyword_trie(keywords) -> str:
+    """
+    Regex source for a set of literal keywords, factored into a prefix trie:
+    ["cred", "creditsense", "cashify"] → "c(?:ashify|red(?:itsense)?)".
+    At each text position the engine branches on the next character instead
+    of trying every keyword in turn — a first-char bucket index, in C.
+    """
+    trie = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}   # end-of-keyword marker
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if "" in node:                     # a keyword ends here; longer ones continue
+            return "(?:" + "|".join(alts) + ")?"
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return emit(trie)
+
+
+def _compile_keywords(keyword_map: dict) -> tuple:
+    """
+    One compiled trie-shaped alternation per label, kept in dict (= priority)
+    order. A single regex search scans the text once in C instead of one
+    Python-level `in` check per keyword; labels are still tried highest-priority first.
+    """
+    return tuple(
+        (label, re.compile(_keyword_trie(keywords)))
+        for label, keywords in keyword_map.items()
+        if label != "Other"
+    )
+
+
+_SENIORITY_PATTERNS = _compile_keywords(_SENIORITY_KWS)
+_INDUSTRY_PATTERNS  = _compile_keywords(_INDUSTRY_KWS)
+
+# Seniority keywords flattened to (tier, keyword) in priority order — with only
+# ~40 short keywords a plain `in` loop beats a regex search on job titles
+_SEN_ENTRIES: tuple[tuple[str, str], ...] = tuple(
+    (tier, kw) for tier, kws in _SENIORITY_KWS.items() for kw in kws
+)
+
+# Weight tables as Series so score_frame maps whole columns with a hash join
+_SENIORITY_WEIGHTS = pd.Series(SENIORITY_WEIGHTS)
+_INDUSTRY_WEIGHTS  = pd.Series(INDUSTRY_WEIGHTS)
+
+
+@lru_cache(maxsize=8192)
 def infer_seniority(title: str) -> str:
     """
     Infer seniority tier from job title.
     Returns: 'C-Suite' | 'VP/Director' | 'Manager/IC'
     """
     t = title.lower()
-    for tier, keywords in SENIORITY_KEYWORD_MAP.items():
-        if any(kw in t for kw in keywords):
+    for tier, kw in _SEN_ENTRIES:
+        if kw in t:
             return tier
     return "Manager/IC"
 
 
+@lru_cache(maxsize=8192)
 def infer_industry(company: str, title: str = "") -> str:
     """
     Infer industry vertical from company name and title text.
@@ -111,10 +174,8 @@ def infer_industry(company: str, title: str = "") -> str:
     Falls back to 'SaaS/B2B' for unknown Indian startup ecosystem contacts.
     """
     text = (company + " " + title).lower()
-    for industry, keywords in INDUSTRY_KEYWORD_MAP.items():
-        if industry == "Other":
-            continue
-        if any(kw.lower() in text for kw in keywords):
+    for industry, pattern in _INDUSTRY_PATTERNS:
+        if pattern.search(text):
             return industry
     return "SaaS/B2B"
 
@@ -155,22 +216,65 @@ def score_row(row: dict) -> dict:
     return row
 
 
+def _classify(text: pd.Series, patterns: tuple, default: str) -> pd.Series:
+    """Column-wise infer_*: first label (in priority order) whose pattern hits."""
+    labels     = pd.Series(default, index=text.index, dtype=object)
+    unassigned = pd.Series(True, index=text.index)
+    for label, pattern in patterns:
+        # Pattern source, not the compiled object, so Arrow strings use pyarrow's regex kernel
+        hit = unassigned & text.str.contains(pattern.pattern, regex=True, na=False)
+        labels[hit] = label
+        unassigned &= ~hit
+    return labels
+
+
+def _keep_existing(df: pd.DataFrame, col: str, inferred: pd.Series) -> pd.Series:
+    """Existing non-blank values win over inferred ones, as in score_row."""
+    if col not in df.columns:
+        return inferred
+    existing = df[col].astype(object)
+    return existing.where(existing.notna() & existing.astype(str).str.strip().ne(""), inferred)
+
+
+def score_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized score_row over a whole DataFrame — one regex pass per label
+    down each column instead of a Python call per row. Returns a new frame.
+    """
+    df = df.copy()
+
+    # Lowercased once into Arrow-backed strings (contiguous UTF-8 buffers);
+    # the company+title text for industry reuses the lowered title
+    title = df["title"].astype("string[pyarrow]").fillna("").str.lower()
+    text  = df["company"].astype("string[pyarrow]").fillna("").str.lower().str.cat(title, sep=" ")
+
+    df["seniority_tier"]    = _keep_existing(
+        df, "seniority_tier", _classify(title, _SENIORITY_PATTERNS, "Manager/IC")
+    )
+    df["industry_vertical"] = _keep_existing(
+        df, "industry_vertical", _classify(text, _INDUSTRY_PATTERNS, "SaaS/B2B")
+    )
+
+    s = df["seniority_tier"].map(_SENIORITY_WEIGHTS).fillna(1)
+    i = df["industry_vertical"].map(_INDUSTRY_WEIGHTS).fillna(0)
+    df["icp_score"] = (s + i).clip(1, 5).astype("int8")   # score is 1–5: one byte per row
+
+    return df
+
+
 # ── CLI: re-score an existing CSV ─────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import pandas as pd
     from config.settings import DATA_RAW, DATA_ENRICHED
 
     input_path  = sys.argv[1] if len(sys.argv) > 1 else DATA_RAW
     output_path = sys.argv[2] if len(sys.argv) > 2 else DATA_ENRICHED
 
     print(f"[icp_scorer] Reading: {input_path}")
-    df = pd.read_csv(input_path)
+    # Existing labels are low-cardinality — read them as categoricals
+    df = pd.read_csv(input_path, dtype={"seniority_tier": "category", "industry_vertical": "category"})
 
-    scored = df.apply(lambda r: pd.Series(score_row(r.to_dict())), axis=1)
-    df["seniority_tier"]    = scored["seniority_tier"]
-    df["industry_vertical"] = scored["industry_vertical"]
-    df["icp_score"]         = scored["icp_score"]
+    df = score_frame(df)
 
     df.to_csv(output_path, index=False)
     print(f"[icp_scorer] Scored {len(df)} contacts → {output_path}")
@@ -23,6 +23,9 @@ import re
 import sys
 import logging
 import argparse
+from collections import Counter
+from multiprocessing import Pool, cpu_count
+import numpy as np
 import pandas as pd
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -33,6 +36,22 @@ log = logging.getLogger(__name__)
 
 OUTPUT_PATH = "data/final/techsparks_outreach_ready.csv"
 
+# Below this many contacts, worker start-up + pickling costs more than it saves
+PARALLEL_MIN_ROWS = 5_000
+
+# Contacts built and written to the output CSV per step
+CHUNK_ROWS = 1_000
+
+# Low-cardinality input columns read as categoricals (1-byte codes, not str objects)
+CSV_DTYPES = {
+    "seniority_tier":    "category",
+    "industry_vertical": "category",
+    "confidence_flag":   "category",
+    "in_sequence":       "category",
+    "outreach_status":   "category",
+    "icp_score":         "int8",
+}
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TEMPLATE DEFINITIONS
@@ -140,10 +159,28 @@ Let me know if useful.
 {sender_name}"""
 
 
+# ── Templates by variant ──────────────────────────────────────────────────────
+
+TEMPLATES = {
+    "A": {"li_connect": LI_CONNECT_A, "dm": DM_A, "email_subject": EMAIL_SUBJECT_A, "email_body": EMAIL_BODY_A},
+    "B": {"li_connect": LI_CONNECT_B, "dm": DM_B, "email_subject": EMAIL_SUBJECT_B, "email_body": EMAIL_BODY_B},
+    "C": {"li_connect": LI_CONNECT_C, "dm": DM_C, "email_subject": EMAIL_SUBJECT_C, "email_body": EMAIL_BODY_C},
+}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # VARIANT SELECTOR
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Industries whose C-Suite contacts get variant A
+VARIANT_A_INDUSTRIES = ("Fintech", "D2C/Ecomm", "SaaS/B2B", "DeepTech/AI", "Edtech", "Mobility")
+
+
+def _text(value: object, default: str = "") -> str:
+    """str() of a cell value, treating missing (None/NaN) as `default`."""
+    return default if value is None or pd.isna(value) else str(value)
+
+
 def select_variant(contact: dict) -> str:
     """
     Determine which message variant (A/B/C) to use.
@@ -156,7 +193,7 @@ def select_variant(contact: dict) -> str:
 
     if industry == "VC/PE":
         return "B"
-    elif seniority == "C-Suite" and industry in ("Fintech","D2C/Ecomm","SaaS/B2B","DeepTech/AI","Edtech","Mobility"):
+    elif seniority == "C-Suite" and industry in VARIANT_A_INDUSTRIES:
         return "A"
     else:
         return "C"
@@ -168,29 +205,31 @@ def select_variant(contact: dict) -> str:
 
 def is_ready_for_linkedin(contact: dict) -> tuple[bool, str]:
     """Check if contact is ready for LinkedIn outreach."""
-    if not str(contact.get("linkedin_url","")).strip():
+    status = _text(contact.get("outreach_status"), "pending")
+    if not _text(contact.get("linkedin_url")).strip():
         return False, "no_linkedin_url"
     if contact.get("confidence_flag") == "LOW":
         return False, "low_confidence_persona"
-    if str(contact.get("in_sequence","")).upper() == "TRUE":
+    if _text(contact.get("in_sequence")).upper() == "TRUE":
         return False, "already_in_sequence"
-    if contact.get("outreach_status","pending") not in ("pending",""):
-        return False, f"status_{contact.get('outreach_status')}"
+    if status not in ("pending",""):
+        return False, f"status_{status}"
     return True, ""
 
 
 def is_ready_for_email(contact: dict) -> tuple[bool, str]:
     """Check if contact is ready for email outreach."""
-    if not str(contact.get("email","")).strip():
+    status = _text(contact.get("outreach_status"), "pending")
+    if not _text(contact.get("email")).strip():
         return False, "no_email"
     if contact.get("icp_score", 0) < 3:
         return False, "icp_too_low"
     if contact.get("confidence_flag") == "LOW":
         return False, "low_confidence_persona"
-    if str(contact.get("in_sequence","")).upper() == "TRUE":
+    if _text(contact.get("in_sequence")).upper() == "TRUE":
         return False, "already_in_sequence"
-    if contact.get("outreach_status","pending") not in ("pending",""):
-        return False, f"status_{contact.get('outreach_status')}"
+    if status not in ("pending",""):
+        return False, f"status_{status}"
     return True, ""
 
 
@@ -204,6 +243,16 @@ SENDER = {
     "SDR":        {"name": "Arjun Sharma",  "title": "Sales Development Rep",   "email": "arjun@company.co"},
 }
 
+# Sender per seniority tier — resolved once from the routing rules
+_SENDER_BY_SENIORITY = {
+    tier: SENDER.get(rule.get("sender_level", "SDR"), SENDER["SDR"])
+    for tier, rule in ROUTING_RULES.items()
+}
+_DEFAULT_SENDER = SENDER["SDR"]
+
+# Honorifics stripped before taking the first name
+HONORIFICS = re.compile(r"^(Dr\.?|Mr\.?|Mrs\.?|Ms\.?|Prof\.?|Shri\.?)\s+", flags=re.IGNORECASE)
+
 
 def extract_variables(contact: dict) -> dict:
     """
@@ -211,44 +260,43 @@ def extract_variables(contact: dict) -> dict:
     Returns a flat dict of substitution values.
     """
     # First name — handle "Dr." and multi-word names
-    full_name  = str(contact.get("name",""))
-    first_name = re.sub(r"^(Dr\.?|Mr\.?|Mrs\.?|Ms\.?|Prof\.?|Shri\.?)\s+", "", full_name, flags=re.IGNORECASE)
-    first_name = first_name.split()[0]
+    full_name  = _text(contact.get("name"))
+    first_name = HONORIFICS.sub("", full_name)
+    first_name = (first_name.split() or [""])[0]
 
     # Themes — stored as pipe-separated string
-    themes_raw = str(contact.get("personalization_themes",""))
+    themes_raw = _text(contact.get("personalization_themes"))
     themes     = [t.strip() for t in themes_raw.split("|") if t.strip()]
     p1 = themes[0].lower() if len(themes) > 0 else "data-driven decision making"
     p2 = themes[1].lower() if len(themes) > 1 else "competitive intelligence"
 
     # Sender based on routing
-    sender_level = ROUTING_RULES.get(contact.get("seniority_tier","Manager/IC"), {}).get("sender_level","SDR")
-    sender       = SENDER.get(sender_level, SENDER["SDR"])
+    sender = _SENDER_BY_SENIORITY.get(contact.get("seniority_tier", ""), _DEFAULT_SENDER)
 
     return {
         "first_name":        first_name,
-        "their_company":     contact.get("company", "your company"),
+        "their_company":     _text(contact.get("company"), "your company"),
         "personalization_1": p1,
         "personalization_2": p2,
-        "context_hook":      str(contact.get("context_hook","")).strip(),
-        "session_topic":     f"{contact.get('industry_vertical','')} strategy and scaling",
+        "context_hook":      _text(contact.get("context_hook")).strip(),
+        "session_topic":     f"{_text(contact.get('industry_vertical'))} strategy and scaling",
         "sender_name":       sender["name"],
         "sender_title":      sender["title"],
         "sender_email":      sender["email"],
     }
 
 
+class _BlankDefault(dict):
+    """Template variables that render any missing key as an empty string."""
+
+    def __missing__(self, key: str) -> str:
+        log.warning(f"Missing template variable: '{key}' — using fallback")
+        return ""
+
+
 def safe_format(template: str, variables: dict) -> str:
     """Format template, replacing any missing variables with a safe fallback."""
-    try:
-        return template.format(**variables)
-    except KeyError as e:
-        log.warning(f"Missing template variable: {e} — using fallback")
-        # Fill missing keys with empty string and retry
-        from string import Formatter
-        keys = [f[1] for f in Formatter().parse(template) if f[1]]
-        safe_vars = {k: variables.get(k, "") for k in keys}
-        return template.format(**safe_vars)
+    return template.format_map(_BlankDefault(variables))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -263,29 +311,29 @@ def build_messages(contact: dict) -> dict:
         dict with keys: variant, li_connect, dm, email_subject, email_body,
                         li_ready, email_ready, li_skip_reason, email_skip_reason
     """
-    variant   = select_variant(contact)
-    variables = extract_variables(contact)
+    variant = select_variant(contact)
 
     li_ok,    li_reason    = is_ready_for_linkedin(contact)
     email_ok, email_reason = is_ready_for_email(contact)
 
+    # Nothing gets rendered for contacts that fail both gates — skip the extraction
+    variables = extract_variables(contact) if li_ok or email_ok else {}
+
+    templates = TEMPLATES[variant]
+
     # ── LinkedIn connection note ───────────────────────────────────────────
-    li_template = {"A": LI_CONNECT_A, "B": LI_CONNECT_B, "C": LI_CONNECT_C}[variant]
-    li_connect  = safe_format(li_template, variables) if li_ok else ""
+    li_connect  = safe_format(templates["li_connect"], variables) if li_ok else ""
 
     # Enforce 300 char limit
     if li_connect and len(li_connect) > 300:
         li_connect = li_connect[:297] + "..."
 
     # ── During-event DM ───────────────────────────────────────────────────
-    dm_template = {"A": DM_A, "B": DM_B, "C": DM_C}[variant]
-    dm          = safe_format(dm_template, variables) if li_ok else ""
+    dm          = safe_format(templates["dm"], variables) if li_ok else ""
 
     # ── Post-event email ──────────────────────────────────────────────────
-    subject_template = {"A": EMAIL_SUBJECT_A, "B": EMAIL_SUBJECT_B, "C": EMAIL_SUBJECT_C}[variant]
-    body_template    = {"A": EMAIL_BODY_A,    "B": EMAIL_BODY_B,    "C": EMAIL_BODY_C}[variant]
-    email_subject    = safe_format(subject_template, variables) if email_ok else ""
-    email_body       = safe_format(body_template,    variables) if email_ok else ""
+    email_subject    = safe_format(templates["email_subject"], variables) if email_ok else ""
+    email_body       = safe_format(templates["email_body"],    variables) if email_ok else ""
 
     return {
         "variant":           variant,
@@ -300,6 +348,154 @@ def build_messages(contact: dict) -> dict:
     }
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# BATCH BUILDER
+# Column-wise equivalent of build_messages for a whole DataFrame
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _text_col(df: pd.DataFrame, col: str, default: str = "") -> pd.Series:
+    """Column as strings, missing cells (or a missing column) → `default`."""
+    if col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    s = df[col]
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Stringify the few categories, then expand via the codes (-1 = missing → default)
+        cats = np.append(s.cat.categories.astype(str).to_numpy(dtype=object), default)
+        return pd.Series(cats[s.cat.codes.to_numpy()], index=df.index)
+    return s.astype(object).where(s.notna(), default).astype(str)
+
+
+def select_variants(df: pd.DataFrame) -> pd.Series:
+    """Vectorized select_variant."""
+    industry  = _text_col(df, "industry_vertical")
+    seniority = _text_col(df, "seniority_tier")
+    return pd.Series(np.select(
+        [industry.eq("VC/PE"), seniority.eq("C-Suite") & industry.isin(VARIANT_A_INDUSTRIES)],
+        ["B", "A"],
+        default="C",
+    ), index=df.index)
+
+
+def _compute_readiness(df: pd.DataFrame) -> tuple[pd.Series, pd.Series, pd.Series, pd.Series]:
+    """
+    Vectorized is_ready_for_linkedin / is_ready_for_email.
+    Returns (li_ok, li_reason, email_ok, email_reason); reasons follow the
+    same check order as the scalar gates, first failing check wins.
+    """
+    status     = _text_col(df, "outreach_status", "pending")
+    low_conf   = _text_col(df, "confidence_flag").eq("LOW")
+    in_seq     = _text_col(df, "in_sequence").str.upper().eq("TRUE")
+    bad_status = ~status.isin(("pending", ""))
+    icp        = df["icp_score"] if "icp_score" in df.columns else pd.Series(0, index=df.index)
+
+    li_reason = pd.Series(np.select(
+        [_text_col(df, "linkedin_url").str.strip().eq(""), low_conf, in_seq, bad_status],
+        ["no_linkedin_url", "low_confidence_persona", "already_in_sequence", "status_" + status],
+        default="",
+    ), index=df.index)
+    email_reason = pd.Series(np.select(
+        [_text_col(df, "email").str.strip().eq(""), icp < 3, low_conf, in_seq, bad_status],
+        ["no_email", "icp_too_low", "low_confidence_persona", "already_in_sequence", "status_" + status],
+        default="",
+    ), index=df.index)
+
+    return li_reason.eq(""), li_reason, email_reason.eq(""), email_reason
+
+
+def extract_variables_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized extract_variables — one column per template variable."""
+    first_name = (
+        _text_col(df, "name").str.replace(HONORIFICS, "", regex=True)
+        .str.split().str[0].fillna("")
+    )
+
+    # Themes — explode the pipe-separated lists, keep the 1st/2nd non-empty per row
+    themes = _text_col(df, "personalization_themes").str.split("|").explode().str.strip()
+    themes = themes[themes.ne("")].str.lower()
+    nth    = themes.groupby(level=0).cumcount()
+    p1     = themes[nth.eq(0)].reindex(df.index).fillna("data-driven decision making")
+    p2     = themes[nth.eq(1)].reindex(df.index).fillna("competitive intelligence")
+
+    # Sender based on routing
+    sender = _text_col(df, "seniority_tier").map(_SENDER_BY_SENIORITY)
+    sender = sender.where(sender.notna(), _DEFAULT_SENDER)
+
+    return pd.DataFrame({
+        "first_name":        first_name,
+        "their_company":     _text_col(df, "company", "your company"),
+        "personalization_1": p1,
+        "personalization_2": p2,
+        "context_hook":      _text_col(df, "context_hook").str.strip(),
+        "session_topic":     _text_col(df, "industry_vertical") + " strategy and scaling",
+        "sender_name":       sender.str["name"],
+        "sender_title":      sender.str["title"],
+        "sender_email":      sender.str["email"],
+    }, index=df.index)
+
+
+def build_messages_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build messages for every contact in `df` at once — same columns as
+    build_messages, aligned with df's rows. Gates, variants and variables are
+    computed column-wise; only the final str.format runs per contact.
+    """
+    df = df.reset_index(drop=True)
+
+    variant = select_variants(df)
+    li_ok, li_reason, email_ok, email_reason = _compute_readiness(df)
+    # Convert once to plain Python lists/dicts for the per-contact render loop —
+    # iterating Series directly would box a NumPy scalar per element.
+    # Variables are only extracted for contacts that pass at least one gate.
+    needs     = (li_ok | email_ok).to_numpy()
+    variables: list[dict] = [{}] * len(df)
+    for pos, vars_ in zip(np.flatnonzero(needs), extract_variables_frame(df[needs]).to_dict(orient="records")):
+        variables[pos] = vars_
+    variants  = variant.tolist()
+
+    def render(kind: str, ready: pd.Series) -> list[str]:
+        return [
+            safe_format(TEMPLATES[v][kind], vars_) if ok else ""
+            for v, vars_, ok in zip(variants, variables, ready.tolist())
+        ]
+
+    # Enforce 300 char limit on connection notes
+    li_connect = [m[:297] + "..." if len(m) > 300 else m for m in render("li_connect", li_ok)]
+
+    return pd.DataFrame({
+        "variant":           variant,
+        "li_connect_msg":    li_connect,
+        "during_event_dm":   render("dm", li_ok),
+        "email_subject":     render("email_subject", email_ok),
+        "email_body":        render("email_body", email_ok),
+        "li_ready":          np.where(li_ok, "YES", "NO"),
+        "email_ready":       np.where(email_ok, "YES", "NO"),
+        "li_skip_reason":    li_reason,
+        "email_skip_reason": email_reason,
+    })
+
+
+def _build_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Pool worker — module-level so it can be pickled."""
+    return build_messages_frame(chunk)
+
+
+def iter_message_chunks(df: pd.DataFrame):
+    """
+    Yield (contacts, messages) slices of CHUNK_ROWS contacts, in order.
+    Large lists are built across one process per core — rows share no
+    state, so each slice builds independently; imap keeps slice order.
+    """
+    chunks  = [df.iloc[i:i + CHUNK_ROWS] for i in range(0, len(df), CHUNK_ROWS)]
+    workers = cpu_count()
+    if len(df) < PARALLEL_MIN_ROWS or workers < 2:
+        for chunk in chunks:
+            yield chunk, build_messages_frame(chunk)
+        return
+
+    with Pool(workers) as pool:
+        yield from zip(chunks, pool.imap(_build_chunk, chunks))
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ORCHESTRATOR
 # ─────────────────────────────────────────────────────────────────────────────
@@ -307,35 +503,76 @@ def build_messages(contact: dict) -> dict:
 def build_all_messages(
     input_path:  str = DATA_FINAL,
     output_path: str = OUTPUT_PATH,
-    limit:       int = None,
-) -> pd.DataFrame:
+    limit:       int | None = None,
+) -> dict:
+    """
+    Build messages for every contact and stream them to `output_path` one
+    slice at a time — only the current slice's rows are held in memory.
 
+    Returns:
+        readiness summary counters (see _new_summary)
+    """
     log.info(f"Loading: {input_path}")
-    df = pd.read_csv(input_path).sort_values("icp_score", ascending=False)
-
-    if limit:
-        df = df.head(limit)
+    df = pd.read_csv(input_path, dtype=CSV_DTYPES)
 
-    results = []
-    for _, row in df.iterrows():
-        contact  = row.to_dict()
-        messages = build_messages(contact)
-        results.append({**contact, **messages})
+    # Preview runs only need the top `limit` — partial selection, not a full sort
+    # (stable sort: ties keep file order, as nlargest does, whatever the column dtype)
+    df = df.nlargest(limit, "icp_score") if limit else df.sort_values("icp_score", ascending=False, kind="stable")
 
-    out_df = pd.DataFrame(results)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    out_df.to_csv(output_path, index=False)
+    summary = _new_summary()
+    header  = True
+    for contacts, messages in iter_message_chunks(df):
+        out = pd.concat([contacts.reset_index(drop=True), messages], axis=1)
+        out.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        _update_summary(summary, out)
+        header = False
     log.info(f"✅ Outreach-ready contacts saved → {output_path}")
 
-    _print_summary(out_df)
-    return out_df
+    _print_summary(summary)
+    return summary
+
+
+def _new_summary() -> dict:
+    return {
+        "total": 0, "li_ready": 0, "email_ready": 0, "both": 0,
+        "variant": Counter(), "li_skip_reason": Counter(), "email_skip_reason": Counter(),
+        "samples": {},   # variant → first LinkedIn-ready row
+    }
+
+
+def _update_summary(summary: dict, out: pd.DataFrame) -> None:
+    """Fold one written slice into the running summary counters."""
+    li_ok = out["li_ready"].eq("YES")
+    em_ok = out["email_ready"].eq("YES")
+
+    summary["total"]       += len(out)
+    summary["li_ready"]    += int(li_ok.sum())
+    summary["email_ready"] += int(em_ok.sum())
+    summary["both"]        += int((li_ok & em_ok).sum())
+
+    # sort=False keeps first-seen order, so ties rank as value_counts would overall
+    for col in ("variant", "li_skip_reason", "email_skip_reason"):
+        values = out.loc[out[col].ne(""), col]
+        summary[col].update(values.value_counts(sort=False).to_dict())
+
+    for v in ("A", "B", "C"):
+        if v not in summary["samples"]:
+            sample = out[out["variant"].eq(v) & li_ok]
+            if not sample.empty:
+                summary["samples"][v] = sample.iloc[0].to_dict()
+
+
+def _counts(counter: Counter, name: str) -> str:
+    """Render a Counter exactly like Series.value_counts().to_string()."""
+    return pd.Series(dict(counter.most_common()), dtype="int64", name="count").rename_axis(name).to_string()
 
 
-def _print_summary(df: pd.DataFrame):
-    total     = len(df)
-    li_ready  = (df["li_ready"]    == "YES").sum()
-    em_ready  = (df["email_ready"] == "YES").sum()
-    both      = ((df["li_ready"] == "YES") & (df["email_ready"] == "YES")).sum()
+def _print_summary(summary: dict) -> None:
+    total     = summary["total"]
+    li_ready  = summary["li_ready"]
+    em_ready  = summary["email_ready"]
+    both      = summary["both"]
 
     print(f"\n{'='*55}")
     print(f"  OUTREACH READINESS SUMMARY")
@@ -345,18 +582,17 @@ def _print_summary(df: pd.DataFrame):
     print(f"  Email ready          : {em_ready}  ({em_ready/total*100:.0f}%)")
     print(f"  Both channels ready  : {both}  ({both/total*100:.0f}%)")
     print(f"\n  Variant distribution:")
-    print(df["variant"].value_counts().to_string())
+    print(_counts(summary["variant"], "variant"))
     print(f"\n  LinkedIn skip reasons:")
-    print(df[df["li_skip_reason"]!=""]["li_skip_reason"].value_counts().to_string())
+    print(_counts(summary["li_skip_reason"], "li_skip_reason"))
     print(f"\n  Email skip reasons:")
-    print(df[df["email_skip_reason"]!=""]["email_skip_reason"].value_counts().to_string())
+    print(_counts(summary["email_skip_reason"], "email_skip_reason"))
     print(f"{'='*55}\n")
 
     # Print one sample message per variant
     for v in ("A","B","C"):
-        sample = df[(df["variant"]==v) & (df["li_ready"]=="YES")]
-        if sample.empty: continue
-        row = sample.iloc[0]
+        row = summary["samples"].get(v)
+        if row is None: continue
         print(f"  SAMPLE VARIANT {v}: {row['name']} @ {row['company']}")
         print(f"  [{row['seniority_tier']} | {row['industry_vertical']} | ICP {row['icp_score']}]")
         print(f"\n  → LinkedIn Connect:")
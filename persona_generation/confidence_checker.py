@@ -19,10 +19,14 @@ Design rationale:
 import re
 import json
 import logging
+import orjson
+import pandas as pd
 
 log = logging.getLogger(__name__)
 
 # ── Generic phrase blacklist (from config, reproduced here for portability) ───
+# Matched with one `in` scan per phrase: at this size that beats both a regex
+# alternation and an Aho-Corasick automaton. Revisit past ~100 phrases.
 
 GENERIC_PHRASES = [
     "as a leader", "in the tech space", "passionate about",
@@ -32,6 +36,12 @@ GENERIC_PHRASES = [
     "cutting edge", "best in class", "world class", "next level",
 ]
 
+# ── LLM output clean-up ───────────────────────────────────────────────────────
+
+_FENCE_OPEN     = re.compile(r"^```(?:json)?\s*")
+_FENCE_CLOSE    = re.compile(r"\s*```$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
 # ── Minimum length thresholds ─────────────────────────────────────────────────
 
 MIN_PERSONA_CHARS  = 80
@@ -48,6 +58,8 @@ def parse_llm_output(raw_output: str) -> tuple[dict | None, str]:
     """
     Parse raw LLM string into a dict.
     Handles common LLM quirks: markdown fences, leading text, trailing commas.
+    Requests carry a json_schema response_format, so clean output is the norm;
+    the clean-up is kept for providers/models that don't enforce it.
 
     Returns:
         (parsed_dict, error_message)
@@ -60,8 +72,8 @@ def parse_llm_output(raw_output: str) -> tuple[dict | None, str]:
     text = raw_output.strip()
 
     # Strip markdown code fences if present
-    text = re.sub(r"^```(?:json)?\s*", "", text)
-    text = re.sub(r"\s*```$", "", text)
+    text = _FENCE_OPEN.sub("", text)
+    text = _FENCE_CLOSE.sub("", text)
     text = text.strip()
 
     # Find the first { and last } to extract JSON object
@@ -73,8 +85,14 @@ def parse_llm_output(raw_output: str) -> tuple[dict | None, str]:
     text = text[start:end+1]
 
     # Fix trailing commas before } or ] (common LLM mistake)
-    text = re.sub(r",\s*([}\]])", r"\1", text)
+    text = _TRAILING_COMMA.sub(r"\1", text)
+
+    try:
+        return orjson.loads(text), ""
+    except orjson.JSONDecodeError:
+        pass
 
+    # orjson is strict (no NaN, ints ≤ 64-bit) — let json decide and word the error
     try:
         parsed = json.loads(text)
         return parsed, ""
@@ -118,7 +136,10 @@ def validate_structure(parsed: dict) -> tuple[bool, list[str]]:
 
 def check_generic_phrases(text: str) -> list[str]:
     """Return list of blacklisted generic phrases found in text."""
-    text_lower = text.lower()
+    return _generic_phrases_in(text.lower())
+
+
+def _generic_phrases_in(text_lower: str) -> list[str]:
     return [phrase for phrase in GENERIC_PHRASES if phrase in text_lower]
 
 
@@ -157,8 +178,8 @@ def check_specificity(parsed: dict, contact: dict) -> tuple[str, list[str]]:
         flags += 1
 
     # ── Generic phrase checks ───────────────────────────────────────────────
-    all_text = " ".join([persona, hook] + [str(t) for t in themes])
-    bad_phrases = check_generic_phrases(all_text)
+    all_text_lower = " ".join([persona, hook] + [str(t) for t in themes]).lower()
+    bad_phrases    = _generic_phrases_in(all_text_lower)
     if bad_phrases:
         reasons.append(f"Generic phrases detected: {bad_phrases}")
         flags += 2  # weighted higher — generic = unusable
@@ -168,11 +189,10 @@ def check_specificity(parsed: dict, contact: dict) -> tuple[str, list[str]]:
     title_words   = [w for w in contact.get("title", "").lower().split()
                      if w not in ("and", "the", "of", "at", "for", "&")]
 
-    all_text_lower = all_text.lower()
-    company_mentioned = any(w in all_text_lower for w in company_words)
-    title_mentioned   = any(w in all_text_lower for w in title_words)
+    mentioned = (any(w in all_text_lower for w in company_words)
+                 or any(w in all_text_lower for w in title_words))
 
-    if not company_mentioned and not title_mentioned:
+    if not mentioned:
         reasons.append("Output doesn't reference contact's company or role — too generic")
         flags += 2
 
@@ -263,22 +283,21 @@ def validate_persona(
 # BATCH SUMMARY
 # ─────────────────────────────────────────────────────────────────────────────
 
-def print_confidence_report(results: list[dict]):
+def print_confidence_report(results_df: pd.DataFrame):
     """Print a summary of confidence distribution across a batch."""
-    from collections import Counter
-    counts = Counter(r["confidence_flag"] for r in results)
-    total  = len(results)
+    levels = ["HIGH", "MEDIUM", "LOW"]
+    counts = results_df["confidence_flag"].value_counts().reindex(levels, fill_value=0).to_numpy()
+    total  = len(results_df)
+    bars   = counts * 30 // total
 
     print("\n" + "=" * 50)
     print("  PERSONA CONFIDENCE REPORT")
     print("=" * 50)
-    for level in ("HIGH", "MEDIUM", "LOW"):
-        n = counts.get(level, 0)
-        bar = "█" * int(n / total * 30)
-        print(f"  {level:<8} {n:>3} ({n/total*100:4.0f}%)  {bar}")
-
-    low_contacts = [r for r in results if r["confidence_flag"] == "LOW"]
-    if low_contacts:
-        print(f"\n  ⚠️  {len(low_contacts)} contacts flagged for human review")
+    for level, n, bar in zip(levels, counts, bars):
+        print(f"  {level:<8} {n:>3} ({n/total*100:4.0f}%)  {'█' * bar}")
+
+    n_low = counts[-1]
+    if n_low:
+        print(f"\n  ⚠️  {n_low} contacts flagged for human review")
         print("  These will NOT be sent to outreach automatically.")
     print("=" * 50 + "\n")
@@ -2,22 +2,32 @@
 persona_generation/persona_generator.py
 =========================================
 Orchestrates LLM persona generation for all enriched contacts.
-Produces a single output file — no checkpoints.
+Requests are dispatched concurrently (asyncio + aiohttp) under one shared
+rate limit. Produces a single output file — no checkpoints.
 """
 
 import os
 import sys
 import time
 import json
+import sqlite3
+import asyncio
+import hashlib
 import logging
 import argparse
-import requests
+import aiohttp
 import pandas as pd
+from collections import Counter
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.settings import OPENROUTER_API_KEY, DATA_ENRICHED, DATA_FINAL
-from persona_generation.prompt_templates import get_prompt, format_user_prompt, ACTIVE_VERSION
-from persona_generation.confidence_checker import validate_persona, print_confidence_report
+from utils.rate_limit import AsyncTokenBucket
+from persona_generation.prompt_templates import (
+    get_prompt, format_user_prompt, ACTIVE_VERSION, PERSONA_SCHEMA, BATCH_PERSONA_SCHEMA,
+)
+from persona_generation.confidence_checker import (
+    validate_persona, print_confidence_report, parse_llm_output, validate_structure,
+)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,51 +41,314 @@ log = logging.getLogger(__name__)
 
 OPENROUTER_URL   = "https://openrouter.ai/api/v1/chat/completions"
 MODEL            = "anthropic/claude-3-haiku"
-RATE_LIMIT_DELAY = 3
+RATE_LIMIT_RPM   = 20      # call_llm_many: shared token bucket, 20 req/min ceiling
+MAX_CONCURRENCY  = 20      # call_llm_many: requests in flight at once
+DISPATCH_BLOCK   = 10      # call_llm_many: same-prompt requests sent back to back
 MAX_RETRIES      = 3
+MAX_TOKENS       = 600     # per persona — batched requests get MAX_TOKENS * batch size
+RETRY_BACKOFF_S  = 10      # 429/5xx/network backoff: base * 2**(attempt-1)
+LLM_CACHE_PATH   = "cache/llm_cache.sqlite"
+OUTPUT_FIELDS    = ["persona_summary", "context_hook", "personalization_themes",
+                    "confidence_flag", "validation_notes"]   # validate_persona() keys
+
+
+# ── Response cache ────────────────────────────────────────────────────────────
+
+class LLMCache:
+    """
+    On-disk SQLite cache of raw LLM completions, keyed by (model, system, user).
+    Re-runs — after a crash, a --limit bump or a prompt tweak — only pay for
+    prompts that actually changed; everything else is served from disk.
+    Only well-formed personas are stored (see `cacheable`); --refresh re-asks
+    the LLM for every contact and overwrites what was there.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm (key TEXT PRIMARY KEY, response TEXT, ts REAL)"
+        )
+
+    @staticmethod
+    def make_key(system_prompt: str, user_prompt: str) -> str:
+        return hashlib.sha256(f"{MODEL}\0{system_prompt}\0{user_prompt}".encode()).hexdigest()
+
+    @staticmethod
+    def cacheable(response: str) -> bool:
+        """True if the response parses and has every persona field — never cache junk."""
+        parsed, _ = parse_llm_output(response)
+        return bool(parsed) and validate_structure(parsed)[0]
 
+    def get(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT response FROM llm WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
 
-def call_llm(system_prompt: str, user_prompt: str) -> str:
+    def set(self, key: str, response: str):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm (key, response, ts) VALUES (?, ?, ?)",
+                (key, response, time.time()),
+            )
+
+
+def _headers() -> dict:
     if not OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY not set.")
-
-    headers = {
+    return {
         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
         "Content-Type":  "application/json",
         "HTTP-Referer":  "https://github.com/techsparks-gtm",
     }
-    payload = {
+
+
+def _payload(system_prompt: str, user_prompt: str, max_tokens: int = MAX_TOKENS,
+             schema: dict = PERSONA_SCHEMA) -> dict:
+    # cache_control marks the system prompt as a reusable prefix — Anthropic (via
+    # OpenRouter) then serves it from its prompt cache on later calls that share it
+    return {
         "model": MODEL,
         "messages": [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}},
+            ]},
             {"role": "user",   "content": user_prompt},
         ],
         "temperature":     0.3,
-        "max_tokens":      600,
-        "response_format": {"type": "json_object"},
+        "max_tokens":      max_tokens,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "persona", "strict": True, "schema": schema},
+        },
     }
 
+
+# ── Concurrent dispatch ───────────────────────────────────────────────────────
+
+def _cached_tokens(usage: dict) -> int:
+    """Prompt tokens read from the provider's prompt cache, per the usage block."""
+    if "cache_read_input_tokens" in usage:
+        return usage["cache_read_input_tokens"] or 0
+    return (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+
+def _retry_after_s(resp) -> float:
+    """
+    Seconds the server asked us to wait on a 429: Retry-After, or — once
+    X-RateLimit-Remaining is 0 — OpenRouter's X-RateLimit-Reset (epoch ms).
+    """
+    headers = resp.headers
+    try:
+        wait = float(headers.get("Retry-After", 0))
+    except ValueError:
+        wait = 0.0
+
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            wait = max(wait, float(headers["X-RateLimit-Reset"]) / 1000 - time.time())
+        except (KeyError, ValueError):
+            pass
+
+    return wait
+
+
+async def call_llm_async(session, bucket, system_prompt: str, user_prompt: str,
+                         label: str = "", max_tokens: int = MAX_TOKENS,
+                         usage: Counter = None, schema: dict = PERSONA_SCHEMA) -> str:
+    """
+    POST one chat completion to OpenRouter. Waits on the shared token bucket,
+    and backs off exponentially on 429/5xx/network errors — longer on a 429
+    if the server's rate-limit headers ask for it.
+    Token usage is tallied into `usage` when given.
+
+    Returns:
+        raw completion text, "" on failure
+    """
+    payload = _payload(system_prompt, user_prompt, max_tokens, schema)
+
     for attempt in range(1, MAX_RETRIES + 1):
+        wait = RETRY_BACKOFF_S * 2 ** (attempt - 1)
         try:
-            time.sleep(RATE_LIMIT_DELAY)
-            resp = requests.post(OPENROUTER_URL, headers=headers, json=payload, timeout=20)
-            if resp.status_code == 200:
-                return resp.json()["choices"][0]["message"]["content"]
-            elif resp.status_code == 429:
-                wait = 30 * attempt
-                log.warning(f"Rate limited — waiting {wait}s")
-                time.sleep(wait)
-            else:
-                log.error(f"API error {resp.status_code}: {resp.text[:300]}")
-                if attempt == MAX_RETRIES:
+            await bucket.acquire()
+            async with session.post(OPENROUTER_URL, json=payload) as resp:
+                if resp.status == 200:
+                    data = await resp.json(content_type=None)
+                    if usage is not None:
+                        tokens = data.get("usage") or {}
+                        usage["prompt_tokens"] += tokens.get("prompt_tokens") or 0
+                        usage["cached_tokens"] += _cached_tokens(tokens)
+                    return data["choices"][0]["message"]["content"]
+
+                text = await resp.text()
+                if resp.status != 429 and resp.status < 500:
+                    log.error(f"[{label}] API error {resp.status}: {text[:300]}")
                     return ""
-        except requests.exceptions.RequestException as e:
-            log.error(f"Request failed (attempt {attempt}): {e}")
-            if attempt < MAX_RETRIES:
-                time.sleep(10)
+                if resp.status == 429:
+                    wait = max(wait, _retry_after_s(resp))
+                log.warning(f"[{label}] API {resp.status} (attempt {attempt}): {text[:100]}")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.error(f"[{label}] Request failed (attempt {attempt}): {e}")
+
+        if attempt < MAX_RETRIES:
+            await asyncio.sleep(wait)
+
     return ""
 
 
+# ── Multi-contact batching ───────────────────────────────────────────────────
+
+BATCH_HEADER = (
+    "Generate personas for the {n} contacts below. Reply with a single JSON object "
+    '{{"personas": [...]}} holding exactly one persona per contact, in the same order, '
+    "each in the output format requested for that contact plus an integer \"contact\" "
+    "field set to that contact's CONTACT number."
+)
+
+
+def _group_prompts(prompts: list[tuple[str, str, str]], batch_size: int,
+                   block: int = DISPATCH_BLOCK) -> list[list[int]]:
+    """
+    Split prompt positions into groups of ≤ batch_size that share a system
+    prompt, in dispatch order: `block` groups from one system prompt, then
+    `block` from the next, round-robin. Runs of `block` keep the provider's
+    prefix cache warm; the rotation keeps each variant's top-ICP contacts
+    (prompts arrive ICP-sorted) near the front in case credits run out.
+    """
+    by_system = {}
+    for n, (system_prompt, _, _) in enumerate(prompts):
+        by_system.setdefault(system_prompt, []).append(n)
+
+    clusters = [
+        [positions[i:i + batch_size] for i in range(0, len(positions), batch_size)]
+        for positions in by_system.values()
+    ]
+    ordered = []
+    for start in range(0, max(map(len, clusters), default=0), block):
+        for groups in clusters:
+            ordered.extend(groups[start:start + block])
+    return ordered
+
+
+def _batch_user_prompt(user_prompts: list[str]) -> str:
+    parts = [BATCH_HEADER.format(n=len(user_prompts))]
+    parts += [f"### CONTACT {n}\n{prompt}" for n, prompt in enumerate(user_prompts, 1)]
+    return "\n\n".join(parts)
+
+
+def _split_batch_output(raw_output: str, n: int) -> list[str] | None:
+    """
+    Split a batched reply back into one raw persona string per contact.
+    Personas are matched by the "contact" number they echo, not by position,
+    so a reordered reply can't save one contact's persona under another's key.
+
+    Returns:
+        list of n JSON strings in CONTACT order, or None if the reply isn't
+        n objects numbered 1..n
+    """
+    parsed, _ = parse_llm_output(raw_output)
+    personas  = (parsed or {}).get("personas")
+    if not isinstance(personas, list) or len(personas) != n:
+        return None
+    if not all(isinstance(persona, dict) for persona in personas):
+        return None
+
+    by_contact = {persona.pop("contact", None): persona for persona in personas}
+    if set(by_contact) != set(range(1, n + 1)):
+        return None
+    return [json.dumps(by_contact[number]) for number in range(1, n + 1)]
+
+
+async def _call_llm_many(prompts: list[tuple[str, str, str]], cache: LLMCache,
+                         keys: list[str], batch_size: int = 1) -> list[str]:
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    bucket    = AsyncTokenBucket(rate=RATE_LIMIT_RPM / 60, burst=RATE_LIMIT_RPM)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY, ttl_dns_cache=300)
+    timeout   = aiohttp.ClientTimeout(total=20 * batch_size)
+    usage     = Counter()
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers=_headers(),
+    ) as session:
+
+        async def single(n):
+            async with semaphore:
+                content = await call_llm_async(session, bucket, *prompts[n], usage=usage)
+            if cache.cacheable(content):
+                cache.set(keys[n], content)   # committed per response, so a crash loses nothing
+            return content
+
+        async def batched(group):
+            if len(group) == 1:
+                return [await single(group[0])]
+
+            label = f"batch x{len(group)}"
+            async with semaphore:
+                raw = await call_llm_async(
+                    session, bucket,
+                    prompts[group[0]][0],
+                    _batch_user_prompt([prompts[n][1] for n in group]),
+                    label,
+                    max_tokens=MAX_TOKENS * len(group),
+                    usage=usage,
+                    schema=BATCH_PERSONA_SCHEMA,
+                )
+
+            contents = _split_batch_output(raw, len(group))
+            if contents is None:
+                log.warning(f"[{label}] Batched reply didn't split into {len(group)} personas — "
+                            f"falling back to one request per contact")
+                return await asyncio.gather(*(single(n) for n in group))
+
+            for n, content in zip(group, contents):
+                if cache.cacheable(content):
+                    cache.set(keys[n], content)
+            return contents
+
+        # Groups come out in blocks per system prompt, so requests sharing a
+        # cacheable prefix are dispatched back to back
+        groups  = _group_prompts(prompts, batch_size)
+        outputs = [""] * len(prompts)
+        for group, contents in zip(groups, await asyncio.gather(*(batched(g) for g in groups))):
+            for n, content in zip(group, contents):
+                outputs[n] = content
+
+    if usage["prompt_tokens"]:
+        log.info(f"Prompt cache: {usage['cached_tokens']}/{usage['prompt_tokens']} prompt tokens "
+                 f"read from cache ({usage['cached_tokens'] / usage['prompt_tokens']:.0%})")
+    return outputs
+
+
+def call_llm_many(prompts: list[tuple[str, str, str]], batch_size: int = 1,
+                  refresh: bool = False) -> list[str]:
+    """
+    Run (system_prompt, user_prompt, label) requests concurrently — up to
+    MAX_CONCURRENCY in flight, RATE_LIMIT_RPM across all of them. Prompts
+    already answered in LLMCache are never re-sent, unless `refresh` is set.
+
+    With batch_size > 1, up to batch_size prompts sharing a system prompt go
+    out as one request, so the system prompt is paid for once per batch.
+    Replies are cached per contact; a batch that doesn't split cleanly is
+    retried one contact at a time.
+
+    Returns:
+        raw completion texts aligned with `prompts` ("" where a call failed)
+    """
+    cache   = LLMCache(LLM_CACHE_PATH)
+    keys    = [cache.make_key(system_prompt, user_prompt) for system_prompt, user_prompt, _ in prompts]
+    outputs = [None] * len(keys) if refresh else [cache.get(key) for key in keys]
+    pending = [n for n, output in enumerate(outputs) if output is None]
+    log.info(f"LLM cache: {len(prompts) - len(pending)} hits, {len(pending)} to request")
+
+    if pending:
+        fresh = asyncio.run(_call_llm_many(
+            [prompts[n] for n in pending], cache, [keys[n] for n in pending], batch_size,
+        ))
+        for n, output in zip(pending, fresh):
+            outputs[n] = output
+    return outputs
+
+
 DRY_RUN_PERSONAS = {
     "default": json.dumps({
         "persona_summary": "As Founder & CEO, this executive owns both product strategy and commercial outcomes. At a bootstrapped fintech operating in a margin-sensitive category, they are acutely focused on pricing strategy, competitive positioning, and unit economics as they scale without external capital to absorb mistakes.",
@@ -108,10 +381,12 @@ def generate_personas(
     output_path: str  = DATA_FINAL,
     dry_run:     bool = False,
     limit:       int  = None,
+    batch_size:  int  = 1,
+    refresh:     bool = False,
 ) -> pd.DataFrame:
 
     log.info(f"Loading: {input_path}")
-    df = pd.read_csv(input_path)
+    df = pd.read_csv(input_path, engine="pyarrow")
     df = df.sort_values("icp_score", ascending=False).reset_index(drop=True)
 
     if limit:
@@ -120,32 +395,36 @@ def generate_personas(
 
     log.info(f"Generating personas for {len(df)} contacts | Model: {MODEL} | Dry run: {dry_run}")
 
-    results       = []
     all_validated = []
     total         = len(df)
+    # Read-only dicts for prompt formatting + validation; results go back as columns
+    contacts      = df.to_dict(orient="records")
+
+    prompts = []
+    for contact in contacts:
+        system_prompt, user_template = get_prompt(contact)
+        prompts.append((system_prompt, format_user_prompt(contact, user_template), contact["name"]))
 
-    for i, row in df.iterrows():
-        contact = row.to_dict()
+    if dry_run:
+        raw_outputs = [get_dry_run_persona(contact) for contact in contacts]
+    else:
+        raw_outputs = call_llm_many(prompts, batch_size=batch_size, refresh=refresh)
+
+    for i, (contact, raw_output) in enumerate(zip(contacts, raw_outputs)):
         log.info(f"[{i+1}/{total}] {contact['name']} @ {contact['company']} "
                  f"(ICP {contact['icp_score']}, {contact['industry_vertical']})")
 
-        system_prompt, user_template = get_prompt(contact)
-        user_prompt = format_user_prompt(contact, user_template)
-
-        raw_output = get_dry_run_persona(contact) if dry_run else call_llm(system_prompt, user_prompt)
+        all_validated.append(validate_persona(raw_output, contact))
 
-        validated = validate_persona(raw_output, contact)
-        all_validated.append(validated)
-        contact.update(validated)
-        results.append(contact)
+    # Persona fields assigned column-wise onto the input frame — no rebuild from row dicts
+    final_df = df.assign(**{field: [v[field] for v in all_validated] for field in OUTPUT_FIELDS})
 
     # Single output file — no checkpoints
-    final_df = pd.DataFrame(results)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     final_df.to_csv(output_path, index=False)
     log.info(f"✅ Personas saved → {output_path}")
 
-    print_confidence_report(all_validated)
+    print_confidence_report(final_df)
     _print_sample_personas(final_df)
     return final_df
 
@@ -172,6 +451,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--limit",   type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Contacts per LLM request (same system prompt only)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached LLM responses and regenerate every persona")
     parser.add_argument("--input",   default=DATA_ENRICHED)
     parser.add_argument("--output",  default=DATA_FINAL)
     args = parser.parse_args()
@@ -181,4 +464,6 @@ if __name__ == "__main__":
         output_path=args.output,
         dry_run=args.dry_run,
         limit=args.limit,
+        batch_size=args.batch_size,
+        refresh=args.refresh,
     )
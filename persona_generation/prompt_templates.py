@@ -5,7 +5,8 @@ All LLM prompts used in the pipeline, versioned and centralized.
 
 Design principles:
   - Every prompt explicitly constrains the LLM to use ONLY provided data
-  - Outputs are structured (JSON) so they're machine-parseable
+  - Outputs are structured (JSON) so they're machine-parseable; PERSONA_SCHEMA
+    is sent as response_format so the provider enforces the shape too
   - Prompts are versioned so we can A/B test and track what changed
   - System prompt sets the role; user prompt passes the contact data
 
@@ -15,6 +16,8 @@ Version history:
   v1.2 — Added anti-hallucination constraints + JSON output enforcement
 """
 
+import json
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PROMPT VERSION IN USE
 # ─────────────────────────────────────────────────────────────────────────────
@@ -127,6 +130,41 @@ OUTPUT FORMAT (valid JSON only):
 }}"""
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# OUTPUT SCHEMA — shared by every prompt variant, enforced via response_format
+# ─────────────────────────────────────────────────────────────────────────────
+
+PERSONA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "persona_summary":        {"type": "string"},
+        "context_hook":           {"type": "string"},
+        "personalization_themes": {"type": "array", "items": {"type": "string"}},
+        "confidence":             {"type": "string", "enum": ["HIGH", "MEDIUM", "LOW"]},
+    },
+    "required": ["persona_summary", "context_hook", "personalization_themes", "confidence"],
+    "additionalProperties": False,
+}
+
+# Multi-contact requests (persona_generator --batch-size) reply with a list;
+# each persona echoes its "### CONTACT n" number so it can't land on the wrong contact
+BATCH_PERSONA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "personas": {
+            "type": "array",
+            "items": {
+                **PERSONA_SCHEMA,
+                "properties": {"contact": {"type": "integer"}, **PERSONA_SCHEMA["properties"]},
+                "required":   ["contact", *PERSONA_SCHEMA["required"]],
+            },
+        },
+    },
+    "required": ["personas"],
+    "additionalProperties": False,
+}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PROMPT SELECTOR — picks the right system+user prompt pair per contact
 # ─────────────────────────────────────────────────────────────────────────────
@@ -151,6 +189,27 @@ def get_prompt(contact: dict) -> tuple[str, str]:
         return SYSTEM_PROMPT_V1_2, USER_PROMPT_V1_2
 
 
+# Only pass fields the LLM should reason about
+# Deliberately exclude: id, source, outreach_status, in_sequence, assigned_to
+ALLOWED_FIELDS = frozenset({
+    "name", "title", "company",
+    "seniority_tier", "industry_vertical", "icp_score",
+    "company_size", "funding_stage",
+})
+
+
+_TEMPLATE_PARTS = {}   # user_prompt_template → (head, tail) around {contact_json}
+
+
+def _template_parts(user_prompt_template: str) -> tuple[str, str]:
+    """Split a template once; .format() on each half un-escapes its {{ }}."""
+    parts = _TEMPLATE_PARTS.get(user_prompt_template)
+    if parts is None:
+        head, tail = user_prompt_template.split("{contact_json}")
+        parts = _TEMPLATE_PARTS[user_prompt_template] = (head.format(), tail.format())
+    return parts
+
+
 def format_user_prompt(contact: dict, user_prompt_template: str) -> str:
     """
     Inject contact data into the user prompt template.
@@ -163,20 +222,15 @@ def format_user_prompt(contact: dict, user_prompt_template: str) -> str:
     Returns:
         Formatted prompt string ready to send to LLM
     """
-    import json
-
-    # Only pass fields the LLM should reason about
-    # Deliberately exclude: id, source, outreach_status, in_sequence, assigned_to
-    ALLOWED_FIELDS = [
-        "name", "title", "company",
-        "seniority_tier", "industry_vertical", "icp_score",
-        "company_size", "funding_stage",
-    ]
+    head, tail = _template_parts(user_prompt_template)
 
-    filtered = {k: v for k, v in contact.items()
-                if k in ALLOWED_FIELDS and v and str(v).strip() not in ["", "nan"]}
+    # Same text as json.dumps(filtered, indent=2) for these flat scalar fields,
+    # without the pure-Python encoder that indent= forces
+    lines = [f"  {json.dumps(k)}: {json.dumps(v)}" for k, v in contact.items()
+             if k in ALLOWED_FIELDS and v and str(v).strip() not in ("", "nan")]
+    contact_json = "{\n" + ",\n".join(lines) + "\n}" if lines else "{}"
 
-    return user_prompt_template.format(contact_json=json.dumps(filtered, indent=2))
+    return head + contact_json + tail
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -199,20 +199,18 @@ def route_all(
 ) -> pd.DataFrame:
 
     log.info(f"Loading: {input_path}")
-    df = pd.read_csv(input_path)
+    df = pd.read_csv(input_path, engine="pyarrow")
 
     # Process highest ICP first — they get first pick of owner capacity
     df = df.sort_values(["icp_score","seniority_tier"], ascending=[False, True]).reset_index(drop=True)
 
     router  = LeadRouter()
-    results = []
+    columns = df.columns.tolist()
 
-    for _, row in df.iterrows():
-        contact = row.to_dict()
-        routing = router.route(contact)
-        results.append({**contact, **routing})
-
-    out_df = pd.DataFrame(results)
+    # Plain tuples → dicts: no per-row Series; routing fields go back as columns
+    routing = [router.route(dict(zip(columns, row))) for row in df.itertuples(index=False, name=None)]
+    routing = pd.DataFrame(routing, index=df.index)
+    out_df  = df.assign(**{col: routing[col] for col in routing.columns})
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     out_df.to_csv(output_path, index=False)
     log.info(f"✅ Routed contacts saved → {output_path}")
@@ -4,7 +4,7 @@ TechSparks 2024 Speaker Scraper
 Step 1 of the AI/GTM Automation Pipeline
 
 HOW TO RUN:
-    pip install selenium beautifulsoup4 pandas requests
+    pip install selenium lxml pandas requests
     # Also install ChromeDriver matching your Chrome version:
     # https://chromedriver.chromium.org/downloads
     python techsparks_scraper.py
@@ -14,20 +14,21 @@ OUTPUT:
     techsparks_contacts_200.csv  — 200-row master list (real + mock)
 """
 
-import time
 import csv
 import json
-import re
+import requests
 import pandas as pd
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
-# ── Selenium is needed because the speakers section is JS-rendered ──────────
+# ── Selenium: fallback for when the speakers section is JS-rendered ─────────
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
 
@@ -35,6 +36,28 @@ from webdriver_manager.chrome import ChromeDriverManager
 # PART 1: Scrape real speakers from the event site
 # ───────────────────────────────────────────────
 
+# Webflow CDN folder unique to speaker photos — used by both the wait and the parse
+SPEAKER_IMG_ID    = "66b075049c4028af44cdcd07"
+SPEAKER_IMG_CSS   = f"img[src*='{SPEAKER_IMG_ID}']"
+SPEAKER_IMG_XPATH = f"//img[contains(@src, '{SPEAKER_IMG_ID}')]"
+
+# Smallest element holding every speaker card — the parent of the images'
+# lowest common ancestor, so each img's enclosing card div is included
+SPEAKER_SECTION_JS = """
+const imgs = document.querySelectorAll(arguments[0]);
+if (!imgs.length) return null;
+let node = imgs[0].parentElement;
+for (const img of imgs) {
+    while (node && !node.contains(img)) node = node.parentElement;
+}
+return node && node.parentElement ? node.parentElement.outerHTML : null;
+"""
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/145.0.7632.76 Safari/537.36"
+)
+
 def init_driver(headless=True):
     options = Options()
     if headless:
@@ -42,74 +65,140 @@ def init_driver(headless=True):
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/145.0.7632.76 Safari/537.36"
-    )
+    options.add_argument(f"user-agent={USER_AGENT}")
+
+    # Only the img src attributes are read, never the pixels — skip downloading them.
+    # "eager" returns from driver.get at DOMContentLoaded; the waits below cover the rest.
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = "eager"
 
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=options)
 
 
+def wait_for_speakers_to_settle(driver, timeout=5, poll=0.2):
+    """
+    Block until the document has finished loading and the number of speaker
+    images is the same on two consecutive polls — i.e. lazy-loading is done.
+    Gives up after `timeout` seconds and lets the caller parse what's there.
+    """
+    last_count = [-1]
+
+    def settled(d):
+        if d.execute_script("return document.readyState") != "complete":
+            return False
+        count = len(d.find_elements(By.CSS_SELECTOR, SPEAKER_IMG_CSS))
+        stable, last_count[0] = count == last_count[0], count
+        return stable
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(settled)
+    except TimeoutException:
+        print(f"  [WARN] Speaker count still changing after {timeout}s — parsing current page")
+
+
+CARD_TEXT_XPATH = ".//div | .//p | .//h2 | .//h3 | .//h4"
+
+def _stripped_text(el):
+    """All text under `el`, each piece stripped, joined with no separator."""
+    return "".join(t.strip() for t in el.itertext())
+
+
+def parse_speaker_cards(html):
+    """Extract speaker dicts from the event page HTML (static or browser-rendered)."""
+    doc = lxml.html.document_fromstring(html)
+    # Script/style/template bodies never count as card text
+    etree.strip_elements(doc, "script", "style", "template", with_tail=False)
+
+    # Speaker cards share a common pattern: an img followed by name + title text nodes
+    # Webflow sites typically wrap each card in a div.w-dyn-item or similar
+    # We'll look for the img CDN path unique to speaker photos
+    speaker_imgs = doc.xpath(SPEAKER_IMG_XPATH)
+
+    print(f"[3/4] Found {len(speaker_imgs)} speaker image elements — extracting data...")
+
+    speakers = []
+    for img in speaker_imgs:
+        # Walk up to the card container, then find sibling text nodes
+        card = img.xpath("ancestor::div[1]")
+        if not card:
+            continue
+
+        # Name is usually the first text-heavy element after the image
+        texts = [text for text in (_stripped_text(el) for el in card[0].xpath(CARD_TEXT_XPATH))
+                 if text]
+
+        if len(texts) >= 2:
+            name = texts[0]
+            title_company = texts[1]
+        elif len(texts) == 1:
+            name = texts[0]
+            title_company = ""
+        else:
+            continue
+
+        # Split "Title, Company" or "Title at Company"
+        title, company = parse_title_company(title_company)
+
+        speakers.append({
+            "name": name,
+            "title": title,
+            "company": company,
+            "source": "scraped_techsparks2024"
+        })
+
+    return speakers
+
+
+def fetch_static_speakers(url):
+    """
+    Try a plain HTTP GET before starting Chrome. If the speaker grid is already
+    in the server-rendered HTML, that's all we need.
+    Returns [] when it isn't (or the request fails) so the caller falls back to Selenium.
+    """
+    try:
+        resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=10)
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"  [WARN] Static fetch failed: {e}")
+        return []
+
+    if SPEAKER_IMG_ID not in resp.text:
+        return []
+    return parse_speaker_cards(resp.text)
+
 
 def scrape_techsparks_speakers():
     """Scrapes speaker cards from the TechSparks 2024 website."""
     url = "https://techsparks.yourstory.com/2024"
+
+    print(f"[1/4] Loading {url} ...")
+    speakers = fetch_static_speakers(url)
+    if speakers:
+        print(f"[4/4] Scraped {len(speakers)} speakers from static HTML — Selenium not needed.")
+        return speakers
+
+    print("  → Speaker grid not in static HTML — rendering with Selenium")
     driver = init_driver(headless=True)
-    speakers = []
 
     try:
-        print(f"[1/4] Loading {url} ...")
         driver.get(url)
 
         # Wait for speaker cards to load (they're in a grid)
         print("[2/4] Waiting for speaker section to render...")
         WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "img[src*='66b075049c4028af44cdcd07']"))
+            EC.presence_of_element_located((By.CSS_SELECTOR, SPEAKER_IMG_CSS))
         )
-        time.sleep(3)  # let lazy-loaded images settle
+        wait_for_speakers_to_settle(driver)  # let lazy-loaded images settle
 
         # Scroll down to trigger any lazy-loading
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2)")
-        time.sleep(2)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        # Speaker cards share a common pattern: an img followed by name + title text nodes
-        # Webflow sites typically wrap each card in a div.w-dyn-item or similar
-        # We'll look for the img CDN path unique to speaker photos
-        speaker_imgs = soup.find_all("img", src=re.compile(r"66b075049c4028af44cdcd07"))
-
-        print(f"[3/4] Found {len(speaker_imgs)} speaker image elements — extracting data...")
-
-        for img in speaker_imgs:
-            # Walk up to the card container, then find sibling text nodes
-            card = img.find_parent("div")
-            if not card:
-                continue
-
-            # Name is usually the first text-heavy element after the image
-            texts = [t.get_text(strip=True) for t in card.find_all(["div", "p", "h2", "h3", "h4"])
-                     if t.get_text(strip=True)]
-
-            if len(texts) >= 2:
-                name = texts[0]
-                title_company = texts[1]
-            elif len(texts) == 1:
-                name = texts[0]
-                title_company = ""
-            else:
-                continue
-
-            # Split "Title, Company" or "Title at Company"
-            title, company = parse_title_company(title_company)
-
-            speakers.append({
-                "name": name,
-                "title": title,
-                "company": company,
-                "source": "scraped_techsparks2024"
-            })
+        wait_for_speakers_to_settle(driver)
+
+        # Serialize only the speaker grid — the full page_source is mostly
+        # scripts/styles that lxml would parse and throw away
+        html = driver.execute_script(SPEAKER_SECTION_JS, SPEAKER_IMG_CSS) or driver.page_source
+        speakers = parse_speaker_cards(html)
 
         print(f"[4/4] Scraped {len(speakers)} speakers successfully.")
 
@@ -204,6 +293,14 @@ INDUSTRY_MAP = {
     "Government": ["government of india", "competition commission", "g20"],
 }
 
+SENIORITY_SCORE = {"C-Suite": 3, "VP/Director": 2, "Manager/IC": 1}
+
+INDUSTRY_SCORE = {
+    "Fintech": 2, "D2C/Ecomm": 2, "SaaS/B2B": 2,
+    "VC/PE": 1, "DeepTech/AI": 1, "Edtech": 1,
+    "Mobility": 1, "Government": 0, "Other": 0
+}
+
 def infer_seniority(title):
     t = title.lower()
     for tier, kws in SENIORITY_KEYWORDS.items():
@@ -223,12 +320,8 @@ def icp_score(seniority, industry):
     Simple ICP score 1–5 for a pricing intelligence / data automation product.
     High value: C-Suite at Fintech/D2C/SaaS/VC
     """
-    s_score = {"C-Suite": 3, "VP/Director": 2, "Manager/IC": 1}.get(seniority, 1)
-    i_score = {
-        "Fintech": 2, "D2C/Ecomm": 2, "SaaS/B2B": 2,
-        "VC/PE": 1, "DeepTech/AI": 1, "Edtech": 1,
-        "Mobility": 1, "Government": 0, "Other": 0
-    }.get(industry, 0)
+    s_score = SENIORITY_SCORE.get(seniority, 1)
+    i_score = INDUSTRY_SCORE.get(industry, 0)
     raw = s_score + i_score
     return min(5, raw)  # cap at 5
 
@@ -470,9 +563,13 @@ def save_csv(rows, filename):
     if not rows:
         print(f"[WARN] No rows to save to {filename}")
         return
-    df = pd.DataFrame(rows)
-    df.to_csv(filename, index=False)
-    print(f"[✓] Saved {len(df)} rows → {filename}")
+    # Straight from the dicts — same bytes as DataFrame.to_csv, without the frame
+    fieldnames = list(dict.fromkeys(k for row in rows for k in row))
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval="", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"[✓] Saved {len(rows)} rows → {filename}")
 
 
 # ───────────────────────────────────────────────
@@ -500,8 +597,8 @@ if __name__ == "__main__":
     print("=" * 55)
     df = pd.DataFrame(master)
     print(f"  Total contacts    : {len(df)}")
-    print(f"  Real (scraped)    : {len(df[df['source'].str.contains('fallback|scraped')])}")
-    print(f"  Mock              : {len(df[df['source'] == 'mock_realistic'])}")
+    print(f"  Real (scraped)    : {df['source'].str.contains('fallback|scraped').sum()}")
+    print(f"  Mock              : {(df['source'] == 'mock_realistic').sum()}")
     print(f"\n  Seniority breakdown:")
     print(df['seniority_tier'].value_counts().to_string())
     print(f"\n  Industry breakdown:")
@@ -0,0 +1,63 @@
+"""
+utils/rate_limit.py
+===================
+Token buckets shared by the API clients (Apollo enrichment, OpenRouter personas).
+
+Both refill at `rate` tokens/sec and bank at most `burst` tokens, so short
+bursts go out immediately while the long-run rate stays under the cap.
+"""
+
+import time
+import asyncio
+import threading
+
+
+class TokenBucket:
+    """Thread-safe token bucket — blocks the calling thread until a token is free."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate     = rate
+        self.capacity = burst
+        self._tokens  = float(burst)
+        self._last    = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last   = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AsyncTokenBucket:
+    """
+    Coroutine-safe token bucket — same refill maths as TokenBucket, but waits
+    with asyncio.sleep so other requests keep progressing meanwhile.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate     = rate
+        self.capacity = burst
+        self._tokens  = float(burst)
+        self._last    = time.monotonic()
+        self._lock    = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then consume it."""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last   = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)